@@ -0,0 +1,56 @@
+"""GET /tasks/ authorized by a versioned token against a subject-only token.
+
+Run with ``python -m benchmarks.bench_auth_fast_path [iterations]``.
+Tokens issued by /auth/token carry the user id and token version, so a
+cached principal authorizes the request without touching the users table.
+Subject-only tokens, issued before and still accepted until they expire,
+look the user up on every request. The app no longer issues them, so the
+benchmark signs one itself.
+"""
+
+import asyncio
+import sys
+
+from jwt import encode
+
+from benchmarks.harness import bench_app, count_statements, measure
+from fast_zero.settings import get_settings
+
+ITERATIONS = 500
+TASKS = 100
+
+
+async def main(iterations=ITERATIONS):
+    async with bench_app() as bench:
+        user = await bench.create_user('reader')
+        await bench.create_tasks(user.id, TASKS)
+        settings = get_settings()
+        legacy_token = encode(
+            {'sub': user.email}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
+        variants = {
+            'subject-only token': {'Authorization': f'Bearer {legacy_token}'},
+            'versioned token': user.headers,
+        }
+
+        results = {}
+        for name, headers in variants.items():
+
+            async def list_tasks(headers=headers):
+                response = await bench.client.get(
+                    '/tasks/', params={'limit': 20}, headers=headers
+                )
+                response.raise_for_status()
+
+            with count_statements(bench.engine) as statements:
+                results[name] = await measure(
+                    f'GET /tasks/ {name}', list_tasks, iterations, warmup=0
+                )
+            print(f'{results[name]} stmts={len(statements) / iterations:>5.1f}')
+
+        speedup = results['versioned token'].rps / results['subject-only token'].rps
+        print(f'{"speedup":<40} {speedup:.2f}x')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,89 @@
+"""Throughput of the bulk task endpoints against the per-item endpoints.
+
+Run with ``python -m benchmarks.bench_bulk [batch_size] [rounds]``.
+"""
+
+import asyncio
+import sys
+import time
+
+from benchmarks.harness import bench_app
+
+BATCH_SIZE = 500
+ROUNDS = 5
+
+
+def new_task(number):
+    return {'title': f'Task {number}', 'description': 'Synced', 'state': 'todo'}
+
+
+async def timed(name, batch_size, rounds, func):
+    elapsed = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await func()
+        elapsed += time.perf_counter() - start
+    print(f'{name:<30} {batch_size * rounds / elapsed:>10.1f} tasks/s')
+
+
+async def main(batch_size=BATCH_SIZE, rounds=ROUNDS):
+    async with bench_app() as bench:
+        user = await bench.create_user('syncer')
+        client = bench.client
+        created_ids = []
+
+        async def create_per_item():
+            for number in range(batch_size):
+                response = await client.post(
+                    '/tasks/', json=new_task(number), headers=user.headers
+                )
+                created_ids.append(response.json()['id'])
+
+        async def create_bulk():
+            response = await client.post(
+                '/tasks/bulk',
+                json=[new_task(number) for number in range(batch_size)],
+                headers=user.headers,
+            )
+            created_ids.extend(item['id'] for item in response.json()['results'])
+
+        async def update_per_item():
+            for task_id in created_ids[:batch_size]:
+                await client.patch(
+                    f'/tasks/{task_id}', json={'state': 'done'}, headers=user.headers
+                )
+
+        async def update_bulk():
+            await client.patch(
+                '/tasks/bulk',
+                json=[
+                    {'id': task_id, 'state': 'doing'}
+                    for task_id in created_ids[:batch_size]
+                ],
+                headers=user.headers,
+            )
+
+        async def delete_per_item():
+            for task_id in created_ids[:batch_size]:
+                await client.delete(f'/tasks/{task_id}', headers=user.headers)
+            del created_ids[:batch_size]
+
+        async def delete_bulk():
+            await client.request(
+                'DELETE',
+                '/tasks/bulk',
+                json=created_ids[:batch_size],
+                headers=user.headers,
+            )
+            del created_ids[:batch_size]
+
+        await timed('POST /tasks/', batch_size, rounds, create_per_item)
+        await timed('POST /tasks/bulk', batch_size, rounds, create_bulk)
+        await timed('PATCH /tasks/{id}', batch_size, rounds, update_per_item)
+        await timed('PATCH /tasks/bulk', batch_size, rounds, update_bulk)
+        await timed('DELETE /tasks/{id}', batch_size, rounds, delete_per_item)
+        await timed('DELETE /tasks/bulk', batch_size, rounds, delete_bulk)
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,31 @@
+"""Authenticated request latency as the number of tasks a user owns grows.
+
+Run with ``python -m benchmarks.bench_current_user``.
+"""
+
+import asyncio
+import sys
+
+from benchmarks.harness import bench_app, measure
+
+TASK_COUNTS = (0, 100, 1_000, 10_000, 50_000)
+
+
+async def main(task_counts=TASK_COUNTS):
+    async with bench_app() as bench:
+        for number, task_count in enumerate(task_counts):
+            user = await bench.create_user(f'owner{number}')
+            await bench.create_tasks(user.id, task_count)
+
+            async def list_first_page(user=user):
+                response = await bench.client.get(
+                    '/tasks/', params={'limit': 10}, headers=user.headers
+                )
+                response.raise_for_status()
+
+            print(await measure(f'GET /tasks/ ({task_count} tasks)', list_first_page))
+
+
+if __name__ == '__main__':
+    counts = tuple(int(arg) for arg in sys.argv[1:]) or TASK_COUNTS
+    asyncio.run(main(counts))
@@ -0,0 +1,84 @@
+"""Memory ceiling and throughput of GET /tasks/export on a large account.
+
+Run with ``python -m benchmarks.bench_export [task_count] [ceiling_mib]``.
+The response is consumed straight from the ASGI app, so the peak reported
+by tracemalloc is the server side cost of the export alone. Exits with a
+non-zero status when the peak goes over the ceiling.
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+from benchmarks.harness import bench_app
+from fast_zero.app import app
+
+TASK_COUNT = 500_000
+CEILING_MIB = 32
+SEED_BATCH = 50_000
+
+
+async def stream_export(headers, params):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'server': ('bench', 80),
+        'client': ('bench', 50000),
+        'root_path': '',
+        'path': '/tasks/export',
+        'raw_path': b'/tasks/export',
+        'query_string': urlencode(params).encode(),
+        'headers': [
+            (name.lower().encode(), value.encode()) for name, value in headers.items()
+        ],
+    }
+    requested = False
+    size = 0
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal size
+        if message['type'] == 'http.response.body':
+            size += len(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def main(task_count=TASK_COUNT, ceiling_mib=CEILING_MIB):
+    async with bench_app() as bench:
+        user = await bench.create_user('exporter')
+        for start in range(0, task_count, SEED_BATCH):
+            await bench.create_tasks(user.id, min(SEED_BATCH, task_count - start))
+
+        exceeded = False
+        for export_format in ('ndjson', 'csv'):
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = await stream_export(user.headers, {'format': export_format})
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_mib = peak / 2**20
+            exceeded = exceeded or peak_mib > ceiling_mib
+            print(
+                f'{export_format:<7} {task_count} rows  {size / 2**20:>8.1f} MiB body  '
+                f'{task_count / elapsed:>9.0f} rows/s  peak {peak_mib:>6.1f} MiB'
+            )
+        if exceeded:
+            sys.exit(f'export peak memory exceeded {ceiling_mib} MiB')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
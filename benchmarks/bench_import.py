@@ -0,0 +1,88 @@
+"""Rows per second of POST /tasks/import against POST /tasks/bulk.
+
+Run with ``python -m benchmarks.bench_import [row_count]``.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import sys
+import time
+
+from benchmarks.harness import bench_app
+
+ROW_COUNT = 50_000
+BODY_CHUNK_ROWS = 1_000
+BULK_BATCH_SIZE = 1_000
+
+
+def new_task(number):
+    return {
+        'title': f'Imported {number}',
+        'description': f'Migrated task {number}',
+        'state': 'todo',
+    }
+
+
+def ndjson_body(row_count):
+    for start in range(0, row_count, BODY_CHUNK_ROWS):
+        numbers = range(start, min(start + BODY_CHUNK_ROWS, row_count))
+        yield ''.join(json.dumps(new_task(number)) + '\n' for number in numbers)
+
+
+def csv_body(row_count):
+    yield 'title,description,state\n'
+    for start in range(0, row_count, BODY_CHUNK_ROWS):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for number in range(start, min(start + BODY_CHUNK_ROWS, row_count)):
+            writer.writerow(new_task(number).values())
+        yield buffer.getvalue()
+
+
+async def encoded(chunks):
+    for chunk in chunks:
+        yield chunk.encode()
+
+
+async def main(row_count=ROW_COUNT):
+    async with bench_app() as bench:
+        user = await bench.create_user('importer')
+        client = bench.client
+
+        for media_type, body in (
+            ('application/x-ndjson', ndjson_body),
+            ('text/csv', csv_body),
+        ):
+            start = time.perf_counter()
+            response = await client.post(
+                '/tasks/import',
+                content=encoded(body(row_count)),
+                headers={**user.headers, 'Content-Type': media_type},
+                timeout=None,
+            )
+            elapsed = time.perf_counter() - start
+            assert response.json()['imported'] == row_count
+            rate = row_count / elapsed
+            print(f'POST /tasks/import {media_type:<22} {rate:>10.1f} rows/s')
+
+        start = time.perf_counter()
+        for batch_start in range(0, row_count, BULK_BATCH_SIZE):
+            await client.post(
+                '/tasks/bulk',
+                json=[
+                    new_task(number)
+                    for number in range(
+                        batch_start, min(batch_start + BULK_BATCH_SIZE, row_count)
+                    )
+                ],
+                headers=user.headers,
+                timeout=None,
+            )
+        rate = row_count / (time.perf_counter() - start)
+        print(f'POST /tasks/bulk {"":<24} {rate:>10.1f} rows/s')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
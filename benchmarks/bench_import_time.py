@@ -0,0 +1,63 @@
+"""Cold import cost of ``fast_zero.app`` and of loading Settings.
+
+Run with ``python -m benchmarks.bench_import_time [runs]``.
+Each run imports the app in a fresh interpreter with ``-X importtime``;
+the slowest imports made by the app module in the last run are listed.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+
+from fast_zero.settings import Settings, get_settings
+
+RUNS = 10
+TOP_IMPORTS = 10
+
+
+def import_app():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import fast_zero.app'],
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(cumulative_us), depth, name.strip()))
+    total = max(cumulative for cumulative, _, _ in imports)
+    return total / 1_000_000, imports
+
+
+def main(runs=RUNS):
+    totals = []
+    for _ in range(runs):
+        total, imports = import_app()
+        totals.append(total)
+    print(
+        f'import fast_zero.app  median={statistics.median(totals) * 1000:>8.1f}ms '
+        f'min={min(totals) * 1000:>8.1f}ms max={max(totals) * 1000:>8.1f}ms'
+    )
+    app_imports = [
+        (cumulative, name) for cumulative, depth, name in imports if depth == 1
+    ]
+    for cumulative, name in sorted(app_imports, reverse=True)[:TOP_IMPORTS]:
+        print(f'  {cumulative / 1000:>8.1f}ms {name}')
+
+    number = 200
+    get_settings()
+    uncached = timeit.timeit(Settings, number=number) / number
+    cached = timeit.timeit(get_settings, number=number) / number
+    print(f'Settings()      {uncached * 1e6:>10.1f}us per call')
+    print(f'get_settings()  {cached * 1e6:>10.1f}us per call')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""Serialization cost of TaskList payloads per response class.
+
+Run with ``python -m benchmarks.bench_json_response [iterations]``.
+"""
+
+import sys
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+
+from fast_zero import schemas
+from fast_zero.models import TaskState
+from fast_zero.responses import FastJSONResponse
+
+PAGE_SIZES = (10, 100, 1000)
+ITERATIONS = 500
+
+
+def task_list(size):
+    states = list(TaskState)
+    return schemas.TaskList(
+        tasks=[
+            {
+                'id': number,
+                'title': f'Task {number}',
+                'description': f'Description {number} with ünïcode',
+                'state': states[number % len(states)],
+            }
+            for number in range(size)
+        ],
+        next_cursor=f'cursor-{datetime(2024, 1, 1).isoformat()}',
+    )
+
+
+def timed(name, iterations, func):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<45} {elapsed / iterations * 1e6:>10.1f} us/response')
+
+
+def main(iterations=ITERATIONS):
+    for size in PAGE_SIZES:
+        payload = task_list(size)
+        content = payload.model_dump(mode='json')
+        timed(
+            f'JSONResponse(model_dump) tasks={size}',
+            iterations,
+            lambda content=content: JSONResponse(content),
+        )
+        timed(
+            f'FastJSONResponse(model_dump) tasks={size}',
+            iterations,
+            lambda content=content: FastJSONResponse(content),
+        )
+        timed(
+            f'TaskList.model_dump_json tasks={size}',
+            iterations,
+            payload.model_dump_json,
+        )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
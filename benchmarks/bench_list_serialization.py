@@ -0,0 +1,84 @@
+"""Column rows serialized to JSON bytes against ORM entities through Pydantic.
+
+Run with ``python -m benchmarks.bench_list_serialization [iterations]``.
+Compares both read paths in-process for page sizes 10/100/1000, then the
+GET /tasks/ and GET /users/ endpoints, which use the column fast path.
+"""
+
+import asyncio
+import sys
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.harness import bench_app, measure
+from fast_zero import schemas
+from fast_zero.loading import TASK_PUBLIC_COLUMNS
+from fast_zero.models import Task, User
+from fast_zero.responses import rows_response
+from fast_zero.security import get_password_hash
+
+PAGE_SIZES = (10, 100, 1000)
+ITERATIONS = 200
+
+
+async def main(iterations=ITERATIONS):
+    async with bench_app() as bench:
+        user = await bench.create_user('reader')
+        await bench.create_tasks(user.id, max(PAGE_SIZES))
+        async with AsyncSession(bench.engine) as session:
+            session.add_all(
+                User(
+                    username=f'user{number}',
+                    password=get_password_hash('x'),
+                    email=f'user{number}@bench.com',
+                )
+                for number in range(max(PAGE_SIZES))
+            )
+            await session.commit()
+
+        for limit in PAGE_SIZES:
+            async with AsyncSession(bench.engine) as session:
+
+                async def orm_path(limit=limit, session=session):
+                    tasks = await session.scalars(
+                        select(Task).where(Task.user_id == user.id).limit(limit)
+                    )
+                    session.expunge_all()
+                    page = schemas.TaskList.model_validate(
+                        {'tasks': tasks.all()}, from_attributes=True
+                    )
+                    return page.model_dump_json()
+
+                async def rows_path(limit=limit, session=session):
+                    tasks = await session.execute(
+                        select(*TASK_PUBLIC_COLUMNS)
+                        .where(Task.user_id == user.id)
+                        .limit(limit)
+                    )
+                    return rows_response('tasks', tasks.all()).body
+
+                orm = await measure(
+                    f'orm + pydantic limit={limit}', orm_path, iterations
+                )
+                rows = await measure(
+                    f'rows + to_json limit={limit}', rows_path, iterations
+                )
+                print(orm)
+                print(rows)
+                print(f'{"speedup":<40} {rows.rps / orm.rps:.2f}x')
+
+        for path in ('/tasks/', '/users/'):
+            for limit in PAGE_SIZES:
+
+                async def get_page(path=path, limit=limit):
+                    response = await bench.client.get(
+                        path, params={'limit': limit}, headers=user.headers
+                    )
+                    response.raise_for_status()
+
+                print(await measure(f'GET {path} limit={limit}', get_page, iterations))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,61 @@
+"""GET /tasks/ latency while a burst of logins hashes passwords.
+
+Run with ``python -m benchmarks.bench_login_storm [concurrent_logins]``.
+"""
+
+import asyncio
+import sys
+
+from benchmarks.harness import bench_app, measure
+from fast_zero.security import password_hash_pool
+
+CONCURRENT_LOGINS = 50
+
+
+async def main(concurrent_logins=CONCURRENT_LOGINS):
+    async with bench_app() as bench:
+        user = await bench.create_user('reader')
+        await bench.create_tasks(user.id, 100)
+        storm_user = await bench.create_user('storm')
+
+        async def list_tasks():
+            response = await bench.client.get(
+                '/tasks/', params={'limit': 10}, headers=user.headers
+            )
+            response.raise_for_status()
+
+        async def login():
+            await bench.client.post(
+                '/auth/token',
+                data={'username': storm_user.email, 'password': 'benchmark'},
+            )
+
+        print(await measure('GET /tasks/ (idle)', list_tasks))
+
+        max_queue_depth = 0
+
+        async def storm():
+            nonlocal max_queue_depth
+            while True:
+                logins = [
+                    asyncio.create_task(login()) for _ in range(concurrent_logins)
+                ]
+                while not all(task.done() for task in logins):
+                    max_queue_depth = max(
+                        max_queue_depth, password_hash_pool.queue_depth
+                    )
+                    await asyncio.sleep(0.001)
+
+        storm_task = asyncio.create_task(storm())
+        await asyncio.sleep(0.1)
+        print(
+            await measure(
+                f'GET /tasks/ ({concurrent_logins} concurrent logins)', list_tasks
+            )
+        )
+        storm_task.cancel()
+        print(f'max password hash queue depth: {max_queue_depth}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
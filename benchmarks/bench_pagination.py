@@ -0,0 +1,46 @@
+"""Offset versus keyset pagination latency on the first and a deep page.
+
+Run with ``python -m benchmarks.bench_pagination [deep_page] [page_size]``.
+"""
+
+import asyncio
+import sys
+
+from benchmarks.harness import bench_app, measure
+from fast_zero.pagination import encode_cursor
+
+DEEP_PAGE = 10_000
+PAGE_SIZE = 10
+
+
+async def main(deep_page=DEEP_PAGE, page_size=PAGE_SIZE):
+    async with bench_app() as bench:
+        user = await bench.create_user('paginator')
+        await bench.create_tasks(user.id, deep_page * page_size)
+        response = await bench.client.get(
+            '/tasks/', params={'limit': 1}, headers=user.headers
+        )
+        first_id = response.json()['tasks'][0]['id']
+        deep_offset = (deep_page - 1) * page_size
+        scenarios = {
+            'offset page 1': {'limit': page_size},
+            f'offset page {deep_page}': {'limit': page_size, 'offset': deep_offset},
+            'cursor page 1': {'limit': page_size},
+            f'cursor page {deep_page}': {
+                'limit': page_size,
+                'cursor': encode_cursor(first_id + deep_offset - 1),
+            },
+        }
+        for name, params in scenarios.items():
+
+            async def get_page(params=params):
+                response = await bench.client.get(
+                    '/tasks/', params=params, headers=user.headers
+                )
+                response.raise_for_status()
+
+            print(await measure(name, get_page))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
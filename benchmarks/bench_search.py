@@ -0,0 +1,60 @@
+"""Ranked full-text search versus substring filters on a large task table.
+
+Run with ``python -m benchmarks.bench_search [task_count]``. Point
+BENCH_DATABASE_URL at Postgres to exercise the GIN index; SQLite uses the
+substring fallback.
+"""
+
+import asyncio
+import sys
+
+from benchmarks.harness import bench_app, measure
+from fast_zero.models import TaskState
+
+TASK_COUNT = 1_000_000
+RARE_EVERY = 10_000
+WORDS = (
+    'invoice report meeting deploy review budget release hiring '
+    'roadmap backup audit migrate refactor onboarding payroll'
+).split()
+
+
+async def main(task_count=TASK_COUNT):
+    async with bench_app() as bench:
+        user = await bench.create_user('searcher')
+        await bench.insert_tasks([
+            {
+                'title': (
+                    f'escalation {number}'
+                    if number % RARE_EVERY == 0
+                    else f'{WORDS[number % len(WORDS)]} {number}'
+                ),
+                'description': ' '.join(
+                    WORDS[(number * step) % len(WORDS)] for step in (3, 5, 7)
+                ),
+                'state': TaskState.todo,
+                'user_id': user.id,
+            }
+            for number in range(task_count)
+        ])
+        scenarios = {
+            'search=escalation': {'search': 'escalation', 'limit': 20},
+            'title=escalation': {'title': 'escalation', 'limit': 20},
+            'search=payroll audit': {'search': 'payroll audit', 'limit': 20},
+            'search=migr': {'search': 'migr', 'limit': 20},
+            'title=payroll': {'title': 'payroll', 'limit': 20},
+            'description=audit': {'description': 'audit', 'limit': 20},
+        }
+        for name, params in scenarios.items():
+
+            async def search(params=params):
+                response = await bench.client.get(
+                    '/tasks/', params=params, headers=user.headers
+                )
+                response.raise_for_status()
+
+            print(await measure(name, search, iterations=50, warmup=2))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,121 @@
+"""Throughput of ``python -m fast_zero.serve`` as the worker count grows.
+
+Run with ``python -m benchmarks.bench_workers [max_workers] [seconds]``.
+Each run starts the production launcher with SERVER_WORKERS=n and drives
+GET /tasks/ from separate load processes, so the load generator does not
+share a core budget with a single server worker. Scaling is reported
+relative to one worker; it can only be near-linear up to the number of
+cores left over after the load processes.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from benchmarks.harness import DATABASE_URL, Stats, bench_app
+
+MAX_WORKERS = os.process_cpu_count() or 1
+SECONDS = 10
+CONCURRENCY = 32
+LOAD_PROCESSES = 2
+PORT = 8765
+
+
+async def _load(url, headers, concurrency, seconds):
+    samples = []
+    deadline = time.perf_counter() + seconds
+
+    async def user_loop(client):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(url, params={'limit': 10}, headers=headers)
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await asyncio.gather(*(user_loop(client) for _ in range(concurrency)))
+    return samples
+
+
+def run_load(url, headers, concurrency, seconds):
+    return asyncio.run(_load(url, headers, concurrency, seconds))
+
+
+def wait_until_ready(base_url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('fast_zero.serve exited during startup')
+        try:
+            httpx.get(f'{base_url}/openapi.json').raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise TimeoutError('fast_zero.serve did not start in time')
+
+
+def measure_workers(workers, headers, seconds):
+    base_url = f'http://127.0.0.1:{PORT}'
+    env = {
+        **os.environ,
+        'DATABASE_URL': DATABASE_URL,
+        'SERVER_HOST': '127.0.0.1',
+        'SERVER_PORT': str(PORT),
+        'SERVER_WORKERS': str(workers),
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'fast_zero.serve'],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(base_url, process)
+        with ProcessPoolExecutor(LOAD_PROCESSES) as executor:
+            futures = [
+                executor.submit(
+                    run_load,
+                    f'{base_url}/tasks/',
+                    headers,
+                    CONCURRENCY // LOAD_PROCESSES,
+                    seconds,
+                )
+                for _ in range(LOAD_PROCESSES)
+            ]
+            samples = [sample for future in futures for sample in future.result()]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait()
+    return Stats(f'workers={workers}', samples), len(samples) / seconds
+
+
+async def seed():
+    async with bench_app() as bench:
+        user = await bench.create_user('loadtester')
+        await bench.create_tasks(user.id, 1_000)
+        return user.headers
+
+
+def main(max_workers=MAX_WORKERS, seconds=SECONDS):
+    headers = asyncio.run(seed())
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        stats, throughput = measure_workers(workers, headers, seconds)
+        baseline = baseline or throughput
+        print(
+            f'workers={workers:<3} {throughput:>9.1f} req/s '
+            f'p50={stats.percentile(50) * 1000:>8.2f}ms '
+            f'p99={stats.percentile(99) * 1000:>8.2f}ms '
+            f'scaling={throughput / baseline:.2f}x'
+        )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,172 @@
+import os
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fast_zero.app import app
+from fast_zero.database import get_session
+from fast_zero.models import Task, TaskState, User, table_registry
+from fast_zero.security import get_password_hash
+
+DATABASE_URL = os.environ.get(
+    'BENCH_DATABASE_URL',
+    f'sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / "fast_zero_bench.sqlite3"}',
+)
+SEED_CHUNK_SIZE = 5_000
+
+
+@dataclass
+class Stats:
+    name: str
+    samples: list[float]
+
+    @property
+    def total(self):
+        return sum(self.samples)
+
+    @property
+    def rps(self):
+        return len(self.samples) / self.total
+
+    def percentile(self, percent):
+        ordered = sorted(self.samples)
+        index = round(percent / 100 * (len(ordered) - 1))
+        return ordered[index]
+
+    def as_dict(self):
+        return {
+            'n': len(self.samples),
+            'rps': self.rps,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'mean_ms': statistics.fmean(self.samples) * 1000,
+        }
+
+    def __str__(self):
+        return (
+            f'{self.name:<40} n={len(self.samples):<6} '
+            f'rps={self.rps:>9.1f} '
+            f'p50={self.percentile(50) * 1000:>8.2f}ms '
+            f'p95={self.percentile(95) * 1000:>8.2f}ms '
+            f'p99={self.percentile(99) * 1000:>8.2f}ms '
+            f'mean={statistics.fmean(self.samples) * 1000:>8.2f}ms'
+        )
+
+
+class Bench:
+    def __init__(self, engine, client):
+        self.engine = engine
+        self.client = client
+
+    async def create_user(self, username, password='benchmark'):
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            user = User(
+                username=username,
+                password=get_password_hash(password),
+                email=f'{username}@bench.com',
+            )
+            session.add(user)
+            await session.commit()
+        response = await self.client.post(
+            '/auth/token',
+            data={'username': user.email, 'password': password},
+        )
+        user.token = response.json()['access_token']
+        user.headers = {'Authorization': f'Bearer {user.token}'}
+        return user
+
+    async def insert_users(self, count, password='benchmark', prefix='seed'):
+        password_hash = get_password_hash(password)
+        async with AsyncSession(self.engine) as session:
+            user_ids = await session.scalars(
+                insert(User).returning(User.id),
+                [
+                    {
+                        'username': f'{prefix}{number}',
+                        'email': f'{prefix}{number}@bench.com',
+                        'password': password_hash,
+                    }
+                    for number in range(count)
+                ],
+            )
+            user_ids = user_ids.all()
+            await session.commit()
+        return user_ids
+
+    async def create_tasks(self, user_id, count, **fields):
+        states = list(TaskState)
+        rows = [
+            {
+                'title': fields.get('title', f'Task {number}'),
+                'description': fields.get('description', f'Description {number}'),
+                'state': fields.get('state', states[number % len(states)]),
+                'user_id': user_id,
+            }
+            for number in range(count)
+        ]
+        await self.insert_tasks(rows)
+
+    async def insert_tasks(self, rows):
+        async with AsyncSession(self.engine) as session:
+            for start in range(0, len(rows), SEED_CHUNK_SIZE):
+                await session.execute(
+                    insert(Task), rows[start : start + SEED_CHUNK_SIZE]
+                )
+            await session.commit()
+            await session.execute(text('ANALYZE tasks'))
+            await session.commit()
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@asynccontextmanager
+async def bench_app(database_url=DATABASE_URL):
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async def get_session_override():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url='http://bench'
+        ) as client:
+            yield Bench(engine, client)
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+async def measure(name, func, iterations=200, warmup=10):
+    for _ in range(warmup):
+        await func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return Stats(name, samples)
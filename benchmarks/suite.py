@@ -0,0 +1,207 @@
+"""Latency and throughput of every router against a seeded database.
+
+Run with ``python -m benchmarks.suite [options]``; see ``--help``.
+Targets SQLite by default, or the database in BENCH_DATABASE_URL. Results
+are written as JSON; pass a previous run as ``--baseline`` to print the
+change per scenario and fail when p95 latency regresses too much.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+from benchmarks.harness import (
+    DATABASE_URL,
+    bench_app,
+    count_statements,
+    measure,
+)
+
+USERS = 100
+TASKS_PER_USER = 1_000
+ITERATIONS = 200
+LOGIN_ITERATIONS = 20
+WARMUP = 10
+MAX_REGRESSION = 0.2
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    parser.add_argument('--users', type=int, default=USERS)
+    parser.add_argument('--tasks-per-user', type=int, default=TASKS_PER_USER)
+    parser.add_argument('--iterations', type=int, default=ITERATIONS)
+    parser.add_argument('--login-iterations', type=int, default=LOGIN_ITERATIONS)
+    parser.add_argument('--output', type=Path, default=Path('bench-results.json'))
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--max-regression', type=float, default=MAX_REGRESSION)
+    parser.add_argument('-k', '--select', help='Only run scenarios containing this')
+    return parser.parse_args(argv)
+
+
+def scenarios(bench, user, task_ids):
+    client = bench.client
+    headers = user.headers
+    numbers = itertools.count()
+
+    refresh_tokens = []
+
+    async def login():
+        response = await client.post(
+            '/auth/token', data={'username': user.email, 'password': 'benchmark'}
+        )
+        response.raise_for_status()
+        refresh_tokens[:] = [response.json()['refresh_token']]
+
+    async def refresh():
+        if not refresh_tokens:
+            await login()
+        response = await client.post(
+            '/auth/refresh_token', json={'refresh_token': refresh_tokens[0]}
+        )
+        response.raise_for_status()
+        refresh_tokens[:] = [response.json()['refresh_token']]
+
+    async def list_users():
+        response = await client.get('/users/', params={'limit': 100})
+        response.raise_for_status()
+
+    async def get_user():
+        response = await client.get(f'/users/{user.id}')
+        response.raise_for_status()
+
+    async def create_user():
+        number = next(numbers)
+        response = await client.post(
+            '/users/',
+            json={
+                'username': f'new{number}',
+                'email': f'new{number}@bench.com',
+                'password': 'benchmark',
+            },
+        )
+        response.raise_for_status()
+
+    async def list_tasks():
+        response = await client.get('/tasks/', params={'limit': 100}, headers=headers)
+        response.raise_for_status()
+
+    async def list_tasks_filtered():
+        response = await client.get(
+            '/tasks/', params={'state': 'done', 'limit': 20}, headers=headers
+        )
+        response.raise_for_status()
+
+    async def create_task():
+        response = await client.post(
+            '/tasks/',
+            json={'title': 'Bench', 'description': 'Created', 'state': 'todo'},
+            headers=headers,
+        )
+        response.raise_for_status()
+
+    async def update_task():
+        task_id = task_ids[next(numbers) % len(task_ids)]
+        response = await client.patch(
+            f'/tasks/{task_id}', json={'state': 'doing'}, headers=headers
+        )
+        response.raise_for_status()
+
+    async def delete_task():
+        response = await client.delete(f'/tasks/{task_ids.pop()}', headers=headers)
+        response.raise_for_status()
+
+    return {
+        'POST /auth/token': login,
+        'POST /auth/refresh_token': refresh,
+        'GET /users/': list_users,
+        'GET /users/{id}': get_user,
+        'POST /users/': create_user,
+        'GET /tasks/': list_tasks,
+        'GET /tasks/?state': list_tasks_filtered,
+        'POST /tasks/': create_task,
+        'PATCH /tasks/{id}': update_task,
+        'DELETE /tasks/{id}': delete_task,
+    }
+
+
+SLOW_SCENARIOS = {'POST /auth/token', 'POST /users/'}
+
+
+async def run(args):
+    results = {}
+    async with bench_app() as bench:
+        await bench.insert_users(args.users - 1)
+        user = await bench.create_user('bench')
+        await bench.create_tasks(user.id, args.tasks_per_user)
+        response = await bench.client.get(
+            '/tasks/', params={'limit': args.tasks_per_user}, headers=user.headers
+        )
+        task_ids = [task['id'] for task in response.json()['tasks']]
+
+        for name, func in scenarios(bench, user, task_ids).items():
+            if args.select and args.select not in name:
+                continue
+            iterations = (
+                args.login_iterations if name in SLOW_SCENARIOS else args.iterations
+            )
+            for _ in range(WARMUP):
+                await func()
+            with count_statements(bench.engine) as statements:
+                stats = await measure(name, func, iterations, warmup=0)
+            results[name] = {
+                **stats.as_dict(),
+                'statements_per_request': len(statements) / iterations,
+            }
+            print(f'{stats} stmts={len(statements) / iterations:>5.1f}')
+    return results
+
+
+def compare(results, baseline, max_regression):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        change = result['p95_ms'] / previous['p95_ms'] - 1
+        statements = (
+            result['statements_per_request'] - previous['statements_per_request']
+        )
+        print(
+            f'{name:<40} p95 {change:>+7.1%}  '
+            f'rps {result["rps"] / previous["rps"] - 1:>+7.1%}  '
+            f'stmts {statements:>+5.1f}'
+        )
+        if change > max_regression or statements > 0:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    report = {
+        'created_at': datetime.now(tz=timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'database': make_url(DATABASE_URL).get_backend_name(),
+        'users': args.users,
+        'tasks_per_user': args.tasks_per_user,
+        'results': results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f'Results written to {args.output}')
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            sys.exit(f'Regressed: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,95 @@
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
+from functools import partial
+
 from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
+
+from fast_zero.database import engine, warm_up_pool
+from fast_zero.events import task_events
+from fast_zero.instrumentation import (
+    MetricsMiddleware,
+    RequestInstrumentationMiddleware,
+)
+from fast_zero.maintenance import (
+    REFRESH_TOKEN_SWEEP_LOCK,
+    TASK_TOMBSTONE_PRUNE_LOCK,
+    prune_task_tombstones,
+    run_periodically,
+)
+from fast_zero.refresh_tokens import sweep_refresh_tokens
+from fast_zero.responses import response_class
+from fast_zero.routers import auth, health, metrics, tasks, users
+from fast_zero.security import principal_cache, warm_up_security
+from fast_zero.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_RETRY_SECONDS = 1.0
+
+
+async def warm_up(app: FastAPI, settings: Settings):
+    while True:
+        try:
+            await warm_up_pool(engine, settings.DATABASE_WARMUP_CONNECTIONS)
+            break
+        except (OSError, SQLAlchemyError):
+            logger.warning('Database warm-up failed, retrying', exc_info=True)
+            await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+    await warm_up_security(settings)
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    # Drop connections inherited from a parent process; each worker owns its pool.
+    await engine.dispose(close=False)
+    principal_cache.clear()
+    settings = app.dependency_overrides.get(get_settings, get_settings)()
+    background_tasks = (
+        asyncio.create_task(warm_up(app, settings)),
+        asyncio.create_task(
+            run_periodically(
+                engine,
+                settings.REFRESH_TOKEN_SWEEP_SECONDS,
+                sweep_refresh_tokens,
+                REFRESH_TOKEN_SWEEP_LOCK,
+            )
+        ),
+        asyncio.create_task(
+            run_periodically(
+                engine,
+                settings.TASK_TOMBSTONE_PRUNE_SECONDS,
+                partial(
+                    prune_task_tombstones,
+                    retention_days=settings.TASK_TOMBSTONE_RETENTION_DAYS,
+                ),
+                TASK_TOMBSTONE_PRUNE_LOCK,
+            )
+        ),
+    )
+    yield
+    app.state.ready = False
+    for task in background_tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    await task_events.close()
+    await engine.dispose()
 
-from fast_zero.routers import auth, tasks, users
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=response_class(get_settings()))
+if get_settings().REQUEST_INSTRUMENTATION_SAMPLE_RATE > 0:
+    app.add_middleware(
+        RequestInstrumentationMiddleware,
+        sample_rate=get_settings().REQUEST_INSTRUMENTATION_SAMPLE_RATE,
+    )
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(tasks.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
+app.add_middleware(MetricsMiddleware)
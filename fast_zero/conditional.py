@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+
+def weak_etag(count: int, updated_at: datetime | None) -> str:
+    stamp = f'{updated_at:%Y%m%d%H%M%S%f}' if updated_at else '0'
+    return f'W/"{count}-{stamp}"'
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    opaque_tag = etag.removeprefix('W/')
+    return any(
+        tag.strip().removeprefix('W/') == opaque_tag for tag in if_none_match.split(',')
+    )
+
+
+def _unmodified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def validators(etag: str, last_modified: datetime | None = None) -> dict[str, str]:
+    headers = {'ETag': etag}
+    if last_modified:
+        headers['Last-Modified'] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_conditional(request: Request) -> bool:
+    return 'if-none-match' in request.headers or 'if-modified-since' in request.headers
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: datetime | None = None
+) -> Response | None:
+    if_none_match = request.headers.get('if-none-match')
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_none_match is not None:
+        unchanged = _etag_matches(if_none_match, etag)
+    elif if_modified_since and last_modified:
+        unchanged = _unmodified_since(if_modified_since, last_modified)
+    else:
+        unchanged = False
+    if unchanged:
+        return Response(
+            status_code=HTTPStatus.NOT_MODIFIED,
+            headers=validators(etag, last_modified),
+        )
+    return None
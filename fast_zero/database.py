@@ -1,8 +1,218 @@
+import time
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from fast_zero.metrics import Counter, Gauge, Histogram, HistogramFamily, registry
+from fast_zero.settings import Settings, get_settings
+
+PENDING_ON_COMMIT_KEY = 'pending_on_commit'
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.wait_seconds = Histogram()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+
+    @property
+    def checked_out(self):
+        return self.checkouts - self.checkins
+
+    def listen(self, target):
+        event.listen(target, 'connect', self._on_connect)
+        event.listen(target, 'checkout', self._on_checkout)
+        event.listen(target, 'checkin', self._on_checkin)
+        event.listen(target, 'invalidate', self._on_invalidate)
+
+    def snapshot(self, pool):
+        stats = {
+            'checked_out': self.checked_out,
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'invalidations': self.invalidations,
+            'timeouts': self.timeouts,
+            'wait_seconds': self.wait_seconds.snapshot(),
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), overflow=max(pool.overflow(), 0))
+        return stats
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics:
+                self.metrics.timeouts += 1
+            raise
+        finally:
+            if self.metrics:
+                self.metrics.wait_seconds.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class RequestStats:
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    'request_stats', default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, *args):
+    if request_stats.get() is not None:
+        conn.info['query_started_at'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, *args):
+    stats = request_stats.get()
+    started_at = conn.info.pop('query_started_at', None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+
+def instrument_engine(engine):
+    target = engine.sync_engine
+    if not event.contains(target, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(target, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(target, 'after_cursor_execute', _after_cursor_execute)
+
+
+def on_commit(session, callback):
+    """Run ``callback`` once the session's outermost transaction commits.
+
+    The callback is dropped if that transaction rolls back instead, so side
+    effects outside the database never announce writes that didn't happen.
+    """
+    session.info.setdefault(PENDING_ON_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_on_commit(session):
+    for callback in session.info.pop(PENDING_ON_COMMIT_KEY, ()):
+        callback()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_commit(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_ON_COMMIT_KEY, None)
+
+
+def _is_memory_database(url):
+    return url.get_backend_name() == 'sqlite' and url.database in {None, '', ':memory:'}
+
+
+def create_engine(settings: Settings, metrics: PoolMetrics):
+    url = make_url(settings.DATABASE_URL)
+    options = {
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+        'query_cache_size': settings.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    if not _is_memory_database(url):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+    engine = create_async_engine(url, **options)
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+    metrics.listen(engine.sync_engine)
+    if settings.REQUEST_INSTRUMENTATION_SAMPLE_RATE > 0:
+        instrument_engine(engine)
+    return engine
+
+
+async def warm_up_pool(engine, connections: int):
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text('SELECT 1'))
+
+
+def register_pool_metrics(engine, metrics: PoolMetrics):
+    def stat(name):
+        return lambda: metrics.snapshot(engine.pool).get(name, 0)
+
+    for metric in (
+        Gauge('db_pool_size', 'Configured pool size', func=stat('size')),
+        Gauge('db_pool_overflow', 'Overflow connections open', func=stat('overflow')),
+        Gauge(
+            'db_pool_checked_out',
+            'Connections currently checked out',
+            func=stat('checked_out'),
+        ),
+        Counter(
+            'db_pool_connects_total',
+            'New DBAPI connections opened',
+            func=stat('connects'),
+        ),
+        Counter(
+            'db_pool_invalidations_total',
+            'Connections invalidated after an error or disconnect',
+            func=stat('invalidations'),
+        ),
+        Counter(
+            'db_pool_timeouts_total',
+            'Checkouts that timed out waiting for a connection',
+            func=stat('timeouts'),
+        ),
+        HistogramFamily(
+            'db_pool_wait_seconds',
+            'Time spent waiting to check out a connection',
+            histogram=metrics.wait_seconds,
+        ),
+    ):
+        registry.register(metric)
 
-from fast_zero.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+pool_metrics = PoolMetrics()
+engine = create_engine(get_settings(), pool_metrics)
+register_pool_metrics(engine, pool_metrics)
 
 
 async def get_session():  # pragma: no cover
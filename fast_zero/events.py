@@ -0,0 +1,186 @@
+import asyncio
+import contextlib
+import json
+import logging
+from collections import defaultdict
+from functools import partial
+
+import psycopg
+from pydantic_core import to_json
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from fast_zero import schemas
+from fast_zero.database import on_commit
+from fast_zero.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'task_events'
+NOTIFY_MAX_PAYLOAD = 7900
+LISTEN_RETRY_SECONDS = 1.0
+LISTEN_READY_TIMEOUT = 5.0
+EVENT_STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+def task_event(event_type: str, tasks=(), ids=None) -> dict:
+    tasks = [
+        schemas.TaskPublic.model_validate(task, from_attributes=True).model_dump(
+            mode='json'
+        )
+        for task in tasks
+    ]
+    event = {'type': event_type, 'ids': ids or [task['id'] for task in tasks]}
+    if tasks:
+        event['tasks'] = tasks
+    return event
+
+
+def _notify_payload(user_id: int, event: dict) -> str:
+    payload = to_json({'user_id': user_id, 'event': event})
+    if len(payload) > NOTIFY_MAX_PAYLOAD and 'tasks' in event:
+        return _notify_payload(user_id, {'type': event['type'], 'ids': event['ids']})
+    if len(payload) > NOTIFY_MAX_PAYLOAD:
+        return _notify_payload(user_id, {'type': event['type']})
+    return payload.decode()
+
+
+class TaskEventBroker:
+    def __init__(self, max_queue: int):
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._subscribers = defaultdict(set)
+
+    @property
+    def subscriber_count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def deliver(self, user_id: int, event: dict):
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(user_id, queue)
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subscribers
+
+    async def publish(self, session, user_id: int, event_type: str, tasks=(), ids=None):
+        if not self.has_subscribers(user_id):
+            return
+        on_commit(
+            session, partial(self.deliver, user_id, task_event(event_type, tasks, ids))
+        )
+
+    async def close(self):
+        pass
+
+    def _drop_all(self):
+        for user_id, queues in list(self._subscribers.items()):
+            for queue in list(queues):
+                self._drop(user_id, queue)
+
+    def _drop(self, user_id, queue):
+        self.unsubscribe(user_id, queue)
+        self.dropped += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+class PostgresTaskEventBroker(TaskEventBroker):
+    def __init__(self, max_queue: int, database_url: str):
+        super().__init__(max_queue)
+        url = make_url(database_url).set(drivername='postgresql')
+        self._conninfo = url.render_as_string(hide_password=False)
+        self._listener = None
+        self._listening = asyncio.Event()
+
+    async def subscribe(self, user_id: int) -> asyncio.Queue:
+        if self._listener is None or self._listener.done():
+            self._listening.clear()
+            self._listener = asyncio.create_task(self._listen())
+        await asyncio.wait_for(self._listening.wait(), LISTEN_READY_TIMEOUT)
+        return await super().subscribe(user_id)
+
+    async def publish(  # noqa: PLR6301
+        self, session, user_id: int, event_type: str, tasks=(), ids=None
+    ):
+        payload = _notify_payload(user_id, task_event(event_type, tasks, ids))
+        await session.execute(select(func.pg_notify(NOTIFY_CHANNEL, payload)))
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def _listen(self):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self._conninfo, autocommit=True
+                ) as connection:
+                    await connection.execute(f'LISTEN {NOTIFY_CHANNEL}')
+                    self._listening.set()
+                    async for notify in connection.notifies():
+                        self._deliver_notify(notify.payload)
+            except psycopg.OperationalError:
+                logger.warning('Task event listener disconnected, reconnecting')
+            except Exception:
+                logger.exception('Task event listener failed, reconnecting')
+            # Notifications sent while reconnecting are lost, so subscribers
+            # have to resync from /tasks/changes.
+            self._listening.clear()
+            self._drop_all()
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+    def _deliver_notify(self, payload: str):
+        try:
+            message = json.loads(payload)
+            self.deliver(message['user_id'], message['event'])
+        except (ValueError, KeyError, TypeError):
+            logger.exception('Discarding malformed task event %r', payload)
+
+
+async def event_stream(queue, unsubscribe):
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), EVENT_STREAM_KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                yield b': keep-alive\n\n'
+                continue
+            if event is None:
+                yield b'event: dropped\ndata: {}\n\n'
+                return
+            yield b'event: %s\ndata: %s\n\n' % (event['type'].encode(), to_json(event))
+    finally:
+        unsubscribe()
+
+
+def create_broker(settings: Settings) -> TaskEventBroker:
+    if settings.TASK_EVENTS_BACKEND == 'postgres':
+        return PostgresTaskEventBroker(
+            settings.TASK_EVENTS_QUEUE_SIZE, settings.DATABASE_URL
+        )
+    return TaskEventBroker(settings.TASK_EVENTS_QUEUE_SIZE)
+
+
+task_events = create_broker(get_settings())
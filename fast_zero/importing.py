@@ -0,0 +1,162 @@
+import codecs
+import csv
+
+import psycopg
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.util import await_only, greenlet_spawn
+
+from fast_zero import schemas
+from fast_zero.models import Task
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 100
+IMPORT_MAX_LINE_LENGTH = 64 * 1024
+IMPORT_COLUMNS = ('title', 'description', 'state', 'user_id')
+COPY_TASKS = f'COPY {Task.__tablename__} ({", ".join(IMPORT_COLUMNS)}) FROM STDIN'
+
+
+class ImportLineTooLong(ValueError):
+    pass
+
+
+def _check_line_length(length: int):
+    if length > IMPORT_MAX_LINE_LENGTH:
+        raise ImportLineTooLong(
+            f'Import lines must be at most {IMPORT_MAX_LINE_LENGTH} characters.'
+        )
+
+
+async def _lines(stream):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    # The unterminated line is kept in parts, so it is joined once, when it ends.
+    pending = []
+    pending_length = 0
+    async for chunk in stream:
+        *lines, rest = decoder.decode(chunk).split('\n')
+        for line in lines:
+            _check_line_length(pending_length + len(line))
+            yield ''.join([*pending, line])
+            pending, pending_length = [], 0
+        _check_line_length(pending_length + len(rest))
+        pending.append(rest)
+        pending_length += len(rest)
+    pending.append(decoder.decode(b'', final=True))
+    _check_line_length(pending_length + len(pending[-1]))
+    if line := ''.join(pending):
+        yield line
+
+
+async def _ndjson_records(lines):
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if line.strip():
+            yield line_number, line
+
+
+class _BlockingLines:
+    # csv.reader pulls lines synchronously; await_only suspends the greenlet
+    # it runs in until the next line has been received.
+    def __init__(self, lines):
+        self._lines = aiter(lines)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return await_only(anext(self._lines)) + '\n'
+        except StopAsyncIteration:
+            raise StopIteration
+
+
+def _read_csv_records(reader, limit):
+    records = []
+    while len(records) < limit:
+        start = reader.line_num + 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as exc:
+            row = exc
+        if row:
+            records.append((start, row))
+    return records
+
+
+async def _csv_records(lines):
+    reader = csv.reader(_BlockingLines(lines), strict=True)
+    header = None
+    while records := await greenlet_spawn(_read_csv_records, reader, IMPORT_CHUNK_SIZE):
+        for start, row in records:
+            if isinstance(row, csv.Error):
+                yield start, row
+            elif header is None:
+                header = [name.strip() for name in row]
+            else:
+                yield start, dict(zip(header, row))
+
+
+async def read_tasks(stream, import_format):
+    records = _csv_records if import_format == 'csv' else _ndjson_records
+    async for line_number, record in records(_lines(stream)):
+        if isinstance(record, csv.Error):
+            yield line_number, None, [{'type': 'csv', 'loc': [], 'msg': str(record)}]
+            continue
+        try:
+            if isinstance(record, str):
+                task = schemas.Task.model_validate_json(record)
+            else:
+                task = schemas.Task.model_validate(record)
+        except ValidationError as exc:
+            yield (
+                line_number,
+                None,
+                exc.errors(
+                    include_url=False, include_context=False, include_input=False
+                ),
+            )
+        else:
+            yield line_number, task, None
+
+
+async def insert_tasks(session, rows):
+    if session.bind.dialect.driver == 'psycopg':
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        try:
+            async with raw_connection.driver_connection.cursor() as cursor:
+                async with cursor.copy(COPY_TASKS) as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+        except psycopg.IntegrityError as exc:
+            # COPY bypasses SQLAlchemy, so its errors arrive untranslated.
+            raise IntegrityError(COPY_TASKS, None, exc) from exc
+    else:
+        await session.execute(
+            insert(Task), [dict(zip(IMPORT_COLUMNS, row)) for row in rows]
+        )
+
+
+async def import_tasks(session, user_id, stream, import_format):
+    imported = rejected = 0
+    errors = []
+    chunk = []
+    async for line_number, task, task_errors in read_tasks(stream, import_format):
+        if task is None:
+            rejected += 1
+            if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({'line': line_number, 'errors': task_errors})
+            continue
+        chunk.append((task.title, task.description, task.state.value, user_id))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            await insert_tasks(session, chunk)
+            imported += len(chunk)
+            chunk = []
+    if chunk:
+        await insert_tasks(session, chunk)
+        imported += len(chunk)
+    return {'imported': imported, 'rejected': rejected, 'errors': errors}
@@ -0,0 +1,125 @@
+import logging
+import random
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from fast_zero.database import RequestStats, request_stats
+from fast_zero.metrics import Counter, Gauge, HistogramFamily, registry
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_STATEMENT_LOG_LENGTH = 200
+UNMATCHED_ROUTE = '<unmatched>'
+
+http_requests = registry.register(
+    Counter(
+        'http_requests_total',
+        'HTTP requests by route and status',
+        ('method', 'route', 'status'),
+    )
+)
+http_request_duration = registry.register(
+    HistogramFamily(
+        'http_request_duration_seconds',
+        'HTTP request latency by route',
+        ('method', 'route'),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge('http_requests_in_flight', 'HTTP requests currently being handled')
+)
+
+
+def server_timing(stats: RequestStats, handler_seconds: float) -> str:
+    return ', '.join((
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements"',
+        f'db-slowest;dur={stats.slowest_seconds * 1000:.2f}',
+        f'app;dur={handler_seconds * 1000:.2f}',
+    ))
+
+
+class RequestInstrumentationMiddleware:
+    def __init__(self, app, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    'Server-Timing',
+                    server_timing(stats, time.perf_counter() - started_at),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            self._log(scope, status_code, stats, time.perf_counter() - started_at)
+
+    @staticmethod
+    def _log(scope, status_code, stats, duration):
+        slowest = stats.slowest_statement
+        logger.info(
+            '%s %s %s',
+            scope['method'],
+            scope['path'],
+            status_code,
+            extra={
+                'http_method': scope['method'],
+                'http_path': scope['path'],
+                'http_status': status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'db_statements': stats.statements,
+                'db_ms': round(stats.db_seconds * 1000, 2),
+                'db_slowest_ms': round(stats.slowest_seconds * 1000, 2),
+                'db_slowest_statement': slowest
+                and slowest[:SLOWEST_STATEMENT_LOG_LENGTH],
+            },
+        )
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get('route')
+            path = route.path if route is not None else UNMATCHED_ROUTE
+            method = scope['method']
+            http_requests.inc(method, path, status_code)
+            http_request_duration.observe(
+                time.perf_counter() - started_at, method, path
+            )
@@ -0,0 +1,10 @@
+from sqlalchemy.orm import raiseload, selectinload
+
+from fast_zero.models import Task, User
+
+USER_IDENTITY = (raiseload('*'),)
+USER_WITH_TASKS = (selectinload(User.tasks),)
+
+USER_PUBLIC_COLUMNS = (User.id, User.username, User.email)
+TASK_PUBLIC_COLUMNS = (Task.id, Task.title, Task.description, Task.state)
+TASK_PUBLIC_KEYS = tuple(column.key for column in TASK_PUBLIC_COLUMNS)
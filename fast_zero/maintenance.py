@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import TaskTombstone, utcnow
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_SWEEP_LOCK = 1
+TASK_TOMBSTONE_PRUNE_LOCK = 2
+
+
+async def prune_task_tombstones(session: AsyncSession, retention_days: int) -> int:
+    pruned = await session.execute(
+        delete(TaskTombstone).where(
+            TaskTombstone.deleted_at < utcnow() - timedelta(days=retention_days)
+        )
+    )
+    await session.commit()
+    return pruned.rowcount
+
+
+async def run_exclusively(session: AsyncSession, lock_key: int, job) -> bool:
+    if session.bind.dialect.name == 'postgresql':
+        locked = await session.scalar(select(func.pg_try_advisory_xact_lock(lock_key)))
+        if not locked:
+            return False
+    await job(session)
+    return True
+
+
+async def run_periodically(engine, interval: float, job, lock_key: int):
+    while True:
+        # Wait first, so short-lived apps such as test clients never run the job.
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSession(engine) as session:
+                if not await run_exclusively(session, lock_key, job):
+                    logger.debug('Maintenance job %s is running in another worker', job)
+        except (OSError, SQLAlchemyError):
+            logger.warning('Maintenance job %s failed', job, exc_info=True)
@@ -0,0 +1,177 @@
+import os
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {'buckets': buckets, 'count': self.count, 'sum': self.sum}
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return str(value)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            _format_value(value)
+            .replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for name, value in labels.items()
+    )
+    return f'{{{pairs}}}'
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames=(), func=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.func = func
+        self.values = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels):
+        return self.values.get(labels, 0)
+
+    def samples(self):
+        if self.func is not None:
+            yield self.name, {}, self.func()
+            return
+        for labels, value in self.values.items():
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class HistogramFamily:
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+        histogram: Histogram | None = None,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self.histograms = {}
+        if histogram is not None:
+            self.histograms[()] = histogram
+
+    def observe(self, value: float, *labels):
+        histogram = self.histograms.get(labels)
+        if histogram is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def samples(self):
+        for values, histogram in self.histograms.items():
+            labels = dict(zip(self.labelnames, values))
+            snapshot = histogram.snapshot()
+            for bound, count in snapshot['buckets'].items():
+                yield f'{self.name}_bucket', {**labels, 'le': bound}, count
+            inf = {**labels, 'le': float('inf')}
+            yield f'{self.name}_bucket', inf, snapshot['count']
+            yield f'{self.name}_sum', labels, snapshot['sum']
+            yield f'{self.name}_count', labels, snapshot['count']
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def exposition(self) -> str:
+        # Every worker keeps its own values, so each series names its process.
+        worker = {'worker': os.getpid()}
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend((
+                f'# HELP {metric.name} {metric.help}',
+                f'# TYPE {metric.name} {metric.type}',
+            ))
+            lines.extend(
+                f'{name}{_format_labels(labels | worker)} {_format_value(value)}'
+                for name, labels, value in metric.samples()
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def register_cache_metrics(name: str, cache, registry: Registry = registry):
+    for metric in (
+        Counter(
+            f'{name}_hits_total',
+            'Lookups answered from the cache',
+            func=lambda: cache.stats()['hits'],
+        ),
+        Counter(
+            f'{name}_misses_total',
+            'Lookups that missed the cache',
+            func=lambda: cache.stats()['misses'],
+        ),
+        Gauge(
+            f'{name}_size',
+            'Entries currently cached',
+            func=lambda: cache.stats()['size'],
+        ),
+    ):
+        registry.register(metric)
@@ -1,11 +1,38 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DateTime, ForeignKey, Index, func, literal_column, text
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 table_registry = registry()
 
+TASK_SEARCH_CONFIG = literal_column("'simple'")
+
+
+class utcnow(FunctionElement):
+    """The database clock as naive UTC, whatever the session TimeZone is.
+
+    Timestamps are stored without a time zone and compared against naive UTC
+    values (cursors, ``since``), so ``now()`` and ``LOCALTIMESTAMP``, which
+    follow the session TimeZone on Postgres, can't be used for them.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    return "timezone('UTC', now())"
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC.
+    return 'CURRENT_TIMESTAMP'
+
 
 class TaskState(str, Enum):
     draft = 'draft'
@@ -18,29 +45,49 @@ class TaskState(str, Enum):
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    __mapper_args__ = {'eager_defaults': True}
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
     email: Mapped[str] = mapped_column(unique=True)
+    token_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
+    tasks_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
+    tasks_changed_at: Mapped[datetime | None] = mapped_column(init=False, default=None)
     tasks: Mapped[list['Task']] = relationship(
         init=False,
+        repr=False,
         cascade='all, delete-orphan',
-        lazy='selectin',
+        lazy='raise',
     )
     created_at: Mapped[datetime] = mapped_column(
         init=False,
-        server_default=func.now(),
+        server_default=utcnow(),
     )
     updated_at: Mapped[datetime] = mapped_column(
         init=False,
-        server_default=func.now(),
-        onupdate=func.now(),
+        server_default=utcnow(),
+        onupdate=utcnow(),
     )
 
 
 @table_registry.mapped_as_dataclass
 class Task:
     __tablename__ = 'tasks'
+    __table_args__ = (
+        Index('ix_tasks_user_id_id', 'user_id', 'id'),
+        Index('ix_tasks_user_id_state_id', 'user_id', 'state', 'id'),
+        Index('ix_tasks_user_id_updated_at_id', 'user_id', 'updated_at', 'id'),
+        Index(
+            'ix_tasks_search',
+            text(f"to_tsvector({TASK_SEARCH_CONFIG}, (title || ' ') || description)"),
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
+    )
+    __mapper_args__ = {'eager_defaults': True}
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
@@ -48,10 +95,50 @@ class Task:
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
     created_at: Mapped[datetime] = mapped_column(
         init=False,
-        server_default=func.now(),
+        server_default=utcnow(),
     )
     updated_at: Mapped[datetime] = mapped_column(
         init=False,
-        server_default=func.now(),
-        onupdate=func.now(),
+        server_default=utcnow(),
+        onupdate=utcnow(),
+    )
+
+
+@table_registry.mapped_as_dataclass
+class TaskTombstone:
+    __tablename__ = 'task_tombstones'
+    __table_args__ = (
+        Index(
+            'ix_task_tombstones_user_id_deleted_at_task_id',
+            'user_id',
+            'deleted_at',
+            'task_id',
+        ),
+    )
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    task_id: Mapped[int]
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False,
+        server_default=utcnow(),
     )
+
+
+@table_registry.mapped_as_dataclass
+class RefreshToken:
+    __tablename__ = 'refresh_tokens'
+    __table_args__ = (
+        Index('ix_refresh_tokens_user_id', 'user_id'),
+        Index('ix_refresh_tokens_family', 'family'),
+    )
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    token_hash: Mapped[str] = mapped_column(unique=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
+    family: Mapped[str]
+    expires_at: Mapped[datetime]
+    revoked_at: Mapped[datetime | None] = mapped_column(default=None)
+
+
+task_search_vector = func.to_tsvector(
+    TASK_SEARCH_CONFIG, Task.title + literal_column("' '") + Task.description
+)
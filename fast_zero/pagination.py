@@ -0,0 +1,70 @@
+import base64
+import binascii
+import json
+from datetime import UTC, datetime
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(*values) -> str:
+    payload = json.dumps(values, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or not values:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def decode_id_cursor(cursor: str) -> int:
+    (last_id,) = decode_cursor(cursor)
+    if not isinstance(last_id, int):
+        raise ValueError('Invalid cursor')
+    return last_id
+
+
+def naive_utc(moment: datetime) -> datetime:
+    # Timestamps are stored without a zone, in UTC.
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(UTC).replace(tzinfo=None)
+
+
+def decode_change_cursor(cursor: str) -> tuple[datetime, int]:
+    values = decode_cursor(cursor)
+    if len(values) != 2 or not isinstance(values[1], int):  # noqa: PLR2004
+        raise ValueError('Invalid cursor')
+    try:
+        return naive_utc(datetime.fromisoformat(values[0])), values[1]
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def paginate(query, key, page):
+    query = query.order_by(key).limit(page.limit)
+    if page.cursor:
+        return query.where(key > decode_id_cursor(page.cursor))
+    return query.offset(page.offset)
+
+
+def next_cursor(rows, page):
+    if rows and len(rows) >= page.limit:
+        return encode_cursor(rows[-1].id)
+    return None
+
+
+def paginate_changes(query, changed_at, key, page):
+    query = query.order_by(changed_at, key).limit(page.limit)
+    if page.cursor:
+        return query.where(
+            tuple_(changed_at, key) > tuple_(*decode_change_cursor(page.cursor))
+        )
+    if page.since:
+        return query.where(changed_at > page.since)
+    return query
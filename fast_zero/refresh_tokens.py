@@ -0,0 +1,121 @@
+import hashlib
+import secrets
+from datetime import UTC, datetime, timedelta
+from functools import partial
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.cache import TTLCache
+from fast_zero.database import on_commit
+from fast_zero.models import RefreshToken
+from fast_zero.security import Principal, load_principal
+from fast_zero.settings import Settings, get_settings
+
+REFRESH_TOKEN_BYTES = 32
+
+revoked_refresh_tokens = TTLCache(
+    maxsize=get_settings().REFRESH_TOKEN_DENYLIST_MAXSIZE,
+    ttl=timedelta(days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS).total_seconds(),
+)
+
+
+def _utcnow():
+    return datetime.now(tz=UTC).replace(tzinfo=None)
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def issue_refresh_token(
+    session: AsyncSession, user_id: int, settings: Settings, family: str | None = None
+) -> str:
+    token = secrets.token_urlsafe(REFRESH_TOKEN_BYTES)
+    await session.execute(
+        insert(RefreshToken).values(
+            token_hash=hash_refresh_token(token),
+            user_id=user_id,
+            family=family or secrets.token_hex(16),
+            expires_at=_utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+async def rotate_refresh_token(
+    session: AsyncSession, token: str, settings: Settings
+) -> tuple[Principal, str] | None:
+    token_hash = hash_refresh_token(token)
+    now = _utcnow()
+    family = revoked_refresh_tokens.get(token_hash)
+    if family is None:
+        rotated = await session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family)
+            .execution_options(synchronize_session=False)
+        )
+        rotated = rotated.one_or_none()
+        if rotated is not None:
+            # Until the rotation commits, a retry must still be able to use it.
+            on_commit(
+                session,
+                partial(revoked_refresh_tokens.set, token_hash, rotated.family),
+            )
+            principal = await load_principal(session, rotated.user_id)
+            if principal is None:
+                # Only reachable without foreign key enforcement (SQLite by
+                # default), where a user's tokens can outlive it. On Postgres
+                # the ON DELETE CASCADE waits for this rotation's row lock.
+                await _revoke_family(session, rotated.family, now)
+                return None
+            new_token = await issue_refresh_token(
+                session, rotated.user_id, settings, rotated.family
+            )
+            return principal, new_token
+        family = await session.scalar(
+            select(RefreshToken.family).where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_not(None),
+            )
+        )
+        if family is None:
+            return None
+    # A rotated token is being replayed, so its whole family is compromised.
+    await _revoke_family(session, family, now)
+    return None
+
+
+async def _revoke_family(session: AsyncSession, family: str, now: datetime):
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family == family, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+
+
+async def revoke_user_refresh_tokens(session: AsyncSession, user_id: int):
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_utcnow())
+    )
+
+
+async def delete_user_refresh_tokens(session: AsyncSession, user_id: int):
+    await session.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+
+
+async def sweep_refresh_tokens(session: AsyncSession) -> int:
+    swept = await session.execute(
+        delete(RefreshToken).where(RefreshToken.expires_at <= _utcnow())
+    )
+    await session.commit()
+    revoked_refresh_tokens.expire()
+    return swept.rowcount
@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from fast_zero.settings import Settings, get_settings
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:  # noqa: PLR6301
+        return to_json(content)
+
+
+def response_class(settings: Settings) -> type[JSONResponse]:
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse
+    return JSONResponse
+
+
+def json_response(content: Any, headers: dict[str, str] | None = None) -> JSONResponse:
+    return response_class(get_settings())(content, headers=headers)
+
+
+def rows_response(
+    key: str,
+    rows,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+    keys: tuple[str, ...] | None = None,
+) -> JSONResponse:
+    if keys is None:
+        items = [row._asdict() for row in rows]
+    else:
+        # Only the leading columns are rendered; the rest ride along for the caller.
+        items = [dict(zip(keys, row)) for row in rows]
+    content = {key: items, 'next_cursor': cursor}
+    return json_response(content, headers=headers)
@@ -8,29 +8,59 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero import schemas
 from fast_zero.database import get_session
+from fast_zero.loading import USER_IDENTITY
 from fast_zero.models import User
-from fast_zero.security import create_access_token, get_current_user, verify_password
+from fast_zero.refresh_tokens import issue_refresh_token, rotate_refresh_token
+from fast_zero.security import create_access_token, verify_password_async
+from fast_zero.settings import Settings, get_settings
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
 T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_Settings = Annotated[Settings, Depends(get_settings)]
 
 
 @router.post('/token', response_model=schemas.Token)
-async def login_for_access_token(form_data: T_OAuth2Form, session: T_Session):
-    user = await session.scalar(select(User).where(User.email == form_data.username))
-    if not user or not verify_password(form_data.password, user.password):
+async def login_for_access_token(
+    form_data: T_OAuth2Form, session: T_Session, settings: T_Settings
+):
+    user = await session.scalar(
+        select(User).where(User.email == form_data.username).options(*USER_IDENTITY)
+    )
+    # Give the connection back to the pool while the password is verified.
+    await session.commit()
+    if not user or not await verify_password_async(form_data.password, user.password):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect email or password',
         )
-    access_token = create_access_token(data={'sub': user.email})
-    return {'access_token': access_token, 'token_type': 'Bearer'}
+    access_token = create_access_token(user, settings)
+    refresh_token = await issue_refresh_token(session, user.id, settings)
+    await session.commit()
+    return {
+        'access_token': access_token,
+        'token_type': 'Bearer',
+        'refresh_token': refresh_token,
+    }
 
 
 @router.post('/refresh_token', response_model=schemas.Token)
-async def refresh_access_token(user: T_CurrentUser):
-    new_access_token = create_access_token(data={'sub': user.email})
-    return {'access_token': new_access_token, 'token_type': 'Bearer'}
+async def refresh_access_token(
+    body: schemas.RefreshTokenRequest, session: T_Session, settings: T_Settings
+):
+    rotated = await rotate_refresh_token(session, body.refresh_token, settings)
+    await session.commit()
+    if rotated is None:
+        raise HTTPException(
+            status_code=HTTPStatus.UNAUTHORIZED,
+            detail='Invalid refresh token',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+    user, refresh_token = rotated
+    access_token = create_access_token(user, settings)
+    return {
+        'access_token': access_token,
+        'token_type': 'Bearer',
+        'refresh_token': refresh_token,
+    }
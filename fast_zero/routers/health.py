@@ -0,0 +1,18 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, HTTPException, Request
+
+from fast_zero import schemas
+
+router = APIRouter(prefix='/health', tags=['health'])
+
+
+@router.get('/ready', response_model=schemas.Message)
+async def readiness(request: Request):
+    if not getattr(request.app.state, 'ready', False):
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Warming up',
+            headers={'Retry-After': '1'},
+        )
+    return {'message': 'Ready'}
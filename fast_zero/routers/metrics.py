@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from fast_zero.metrics import registry
+
+router = APIRouter(tags=['metrics'])
+
+EXPOSITION_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@router.get(
+    '/metrics',
+    response_class=PlainTextResponse,
+    description=(
+        'Prometheus metrics of the worker serving the request, labelled with its '
+        'process id. The endpoint is unauthenticated, so keep it off public '
+        'networks.'
+    ),
+)
+async def metrics():
+    return PlainTextResponse(registry.exposition(), media_type=EXPOSITION_CONTENT_TYPE)
@@ -1,20 +1,137 @@
+import csv
+import heapq
+import io
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from functools import partial
 from http import HTTPStatus
+from itertools import islice
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from sqlalchemy import delete, false, insert, select, true, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_zero import schemas
+from fast_zero import importing, schemas
+from fast_zero.conditional import (
+    is_conditional,
+    not_modified,
+    validators,
+    weak_etag,
+)
 from fast_zero.database import get_session
-from fast_zero.models import Task, User
-from fast_zero.security import get_current_user
+from fast_zero.events import event_stream, task_events
+from fast_zero.loading import TASK_PUBLIC_COLUMNS, TASK_PUBLIC_KEYS
+from fast_zero.models import Task, TaskTombstone, User, utcnow
+from fast_zero.pagination import (
+    decode_change_cursor,
+    encode_cursor,
+    next_cursor,
+    paginate,
+    paginate_changes,
+)
+from fast_zero.responses import rows_response
+from fast_zero.search import search_tasks
+from fast_zero.security import Principal, get_current_user, principal_gone
+from fast_zero.settings import Settings, get_settings
 
 router = APIRouter(prefix='/tasks', tags=['tasks'])
 
 
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_CurrentUser = Annotated[Principal, Depends(get_current_user)]
+T_Settings = Annotated[Settings, Depends(get_settings)]
+
+
+@asynccontextmanager
+async def inserting_for(session: AsyncSession, current_user: Principal):
+    try:
+        yield
+    except IntegrityError:
+        # The user was deleted on another worker while its principal was cached.
+        await session.rollback()
+        raise principal_gone(current_user.id)
+
+
+BULK_MAX_ITEMS = 1000
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+IMPORT_FORMATS = {
+    media_type: import_format
+    for import_format, media_type in EXPORT_MEDIA_TYPES.items()
+}
+
+
+def filter_tasks(user_id: int, filter_task: schemas.TaskFilters, dialect_name: str):
+    query = select(Task).where(Task.user_id == user_id)
+    if filter_task.title:
+        query = query.where(Task.title.icontains(filter_task.title))
+    if filter_task.description:
+        query = query.where(Task.description.icontains(filter_task.description))
+    if filter_task.state:
+        query = query.where(Task.state == filter_task.state)
+    if filter_task.search:
+        query = search_tasks(query, filter_task.search, dialect_name)
+    return query
+
+
+async def touch_tasks(session: AsyncSession, user_id: int):
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            tasks_version=User.tasks_version + 1,
+            tasks_changed_at=utcnow(),
+            # Task writes are not changes to the user's own representation.
+            updated_at=User.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _tasks_version_columns(user_id: int):
+    return tuple(
+        select(column).where(User.id == user_id).scalar_subquery()
+        for column in (User.tasks_version, User.tasks_changed_at)
+    )
+
+
+async def _load_tasks_version(session: AsyncSession, user_id: int):
+    version = await session.execute(select(*_tasks_version_columns(user_id)))
+    version = version.one()
+    if version[0] is None:
+        raise principal_gone(user_id)
+    return version
+
+
+def _ndjson_chunk(rows):
+    return b''.join(to_json(row._asdict()) + b'\n' for row in rows)
+
+
+def _csv_chunk(records):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(records)
+    return buffer.getvalue().encode()
+
+
+async def _export_tasks(bind, query, export_format):
+    if export_format == 'csv':
+        yield _csv_chunk([[column.key for column in TASK_PUBLIC_COLUMNS]])
+    async with AsyncSession(bind) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for rows in result.partitions():
+            if export_format == 'csv':
+                yield _csv_chunk(
+                    (row.id, row.title, row.description, row.state.value)
+                    for row in rows
+                )
+            else:
+                yield _ndjson_chunk(rows)
 
 
 @router.post('/', response_model=schemas.TaskPublic)
@@ -29,29 +146,303 @@ async def create_task(
         state=task.state,
         user_id=current_user.id,
     )
-    session.add(task_model)
-    await session.commit()
-    await session.refresh(task_model)
+    async with inserting_for(session, current_user):
+        session.add(task_model)
+        await session.flush()
+        await touch_tasks(session, current_user.id)
+        await task_events.publish(session, current_user.id, 'created', [task_model])
+        await session.commit()
     return task_model
 
 
 @router.get('/', response_model=schemas.TaskList)
 async def get_tasks(
+    request: Request,
     filter_task: Annotated[schemas.FilterTask, Query()],
     current_user: T_CurrentUser,
     session: T_Session,
 ):
-    query = select(Task).where(Task.user_id == current_user.id)
-    if filter_task.title:
-        query = query.where(Task.title.icontains(filter_task.title))
-    if filter_task.description:
-        query = query.where(Task.description.icontains(filter_task.description))
-    if filter_task.state:
-        query = query.where(Task.state == filter_task.state)
-    tasks = await session.scalars(
-        query.offset(filter_task.offset).limit(filter_task.limit)
+    query = filter_tasks(current_user.id, filter_task, session.bind.dialect.name)
+    query = paginate(
+        query.with_only_columns(*TASK_PUBLIC_COLUMNS), Task.id, filter_task
+    )
+    if is_conditional(request):
+        tasks_version, changed_at = await _load_tasks_version(session, current_user.id)
+        etag = weak_etag(tasks_version, changed_at)
+        if response := not_modified(request, etag, changed_at):
+            return response
+        tasks = await session.execute(query)
+        tasks = tasks.all()
+    else:
+        # The validators ride along in the page query, keeping it one statement.
+        tasks = await session.execute(
+            query.add_columns(*_tasks_version_columns(current_user.id))
+        )
+        tasks = tasks.all()
+        if tasks:
+            tasks_version, changed_at = tasks[0][len(TASK_PUBLIC_KEYS) :]
+        else:
+            tasks_version, changed_at = await _load_tasks_version(
+                session, current_user.id
+            )
+        etag = weak_etag(tasks_version, changed_at)
+    cursor = None if filter_task.search else next_cursor(tasks, filter_task)
+    return rows_response(
+        'tasks',
+        tasks,
+        cursor,
+        headers=validators(etag, changed_at),
+        keys=TASK_PUBLIC_KEYS,
+    )
+
+
+@router.get('/export')
+async def export_tasks(
+    filter_task: Annotated[schemas.FilterTaskExport, Query()],
+    current_user: T_CurrentUser,
+    session: T_Session,
+):
+    query = filter_tasks(current_user.id, filter_task, session.bind.dialect.name)
+    query = query.with_only_columns(*TASK_PUBLIC_COLUMNS).order_by(Task.id)
+    return StreamingResponse(
+        _export_tasks(session.bind, query, filter_task.format),
+        media_type=EXPORT_MEDIA_TYPES[filter_task.format],
+    )
+
+
+@router.get('/stream')
+async def stream_tasks(current_user: T_CurrentUser):
+    try:
+        queue = await task_events.subscribe(current_user.id)
+    except TimeoutError:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Task events are unavailable, try again later.',
+            headers={'Retry-After': '1'},
+        )
+    return StreamingResponse(
+        event_stream(queue, partial(task_events.unsubscribe, current_user.id, queue)),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
     )
-    return {'tasks': tasks.all()}
+
+
+@router.get('/changes', response_model=schemas.TaskChanges)
+async def get_task_changes(
+    filter_changes: Annotated[schemas.FilterTaskChanges, Query()],
+    current_user: T_CurrentUser,
+    session: T_Session,
+    settings: T_Settings,
+):
+    db_now = await session.scalar(select(utcnow()))
+    resume_from = (
+        decode_change_cursor(filter_changes.cursor)[0]
+        if filter_changes.cursor
+        else filter_changes.since
+    )
+    retention = timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+    if resume_from is not None and resume_from < db_now - retention:
+        raise HTTPException(
+            status_code=HTTPStatus.GONE,
+            detail='Changes before this point were pruned, sync from scratch',
+        )
+    tasks = await session.execute(
+        paginate_changes(
+            select(
+                *TASK_PUBLIC_COLUMNS,
+                Task.updated_at.label('changed_at'),
+                false().label('deleted'),
+            ).where(Task.user_id == current_user.id),
+            Task.updated_at,
+            Task.id,
+            filter_changes,
+        )
+    )
+    tombstones = await session.execute(
+        paginate_changes(
+            select(
+                TaskTombstone.task_id.label('id'),
+                TaskTombstone.deleted_at.label('changed_at'),
+                true().label('deleted'),
+            ).where(TaskTombstone.user_id == current_user.id),
+            TaskTombstone.deleted_at,
+            TaskTombstone.task_id,
+            filter_changes,
+        )
+    )
+    changes = list(
+        islice(
+            heapq.merge(tasks, tombstones, key=lambda row: (row.changed_at, row.id)),
+            filter_changes.limit,
+        )
+    )
+    result = {
+        'tasks': [row for row in changes if not row.deleted],
+        'deleted': [row.id for row in changes if row.deleted],
+        'watermark': None,
+        'next_cursor': None,
+    }
+    if len(changes) >= filter_changes.limit:
+        # Rows sharing the last timestamp may continue on the next page, which
+        # only the composite cursor can resume from.
+        last = changes[-1]
+        result['next_cursor'] = encode_cursor(last.changed_at, last.id)
+        return result
+    watermark = changes[-1].changed_at if changes else resume_from
+    if watermark is not None:
+        # updated_at is the transaction start time, so a transaction that is
+        # still running can commit rows older than the newest one seen here.
+        lag = timedelta(seconds=settings.TASK_CHANGES_SAFETY_LAG_SECONDS)
+        watermark = min(watermark, db_now - lag)
+    result['watermark'] = watermark
+    return result
+
+
+@router.post(
+    '/import',
+    response_model=schemas.TaskImportResult,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                media_type: {'schema': {'type': 'string'}}
+                for media_type in IMPORT_FORMATS
+            },
+        }
+    },
+)
+async def import_tasks(
+    request: Request,
+    current_user: T_CurrentUser,
+    session: T_Session,
+):
+    media_type = request.headers.get('content-type', '').partition(';')[0].strip()
+    if media_type not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+            detail='Import body must be NDJSON or CSV.',
+        )
+    async with inserting_for(session, current_user):
+        try:
+            result = await importing.import_tasks(
+                session, current_user.id, request.stream(), IMPORT_FORMATS[media_type]
+            )
+        except UnicodeDecodeError:
+            await session.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail='Import body must be UTF-8 encoded.',
+            )
+        except importing.ImportLineTooLong as exc:
+            await session.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+            )
+        if result['imported']:
+            await touch_tasks(session, current_user.id)
+        await session.commit()
+    return result
+
+
+@router.post('/bulk', response_model=schemas.TaskBulkResultList)
+async def create_tasks_bulk(
+    tasks: Annotated[list[schemas.Task], Body(min_length=1, max_length=BULK_MAX_ITEMS)],
+    current_user: T_CurrentUser,
+    session: T_Session,
+):
+    async with inserting_for(session, current_user):
+        task_models = await session.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [{**task.model_dump(), 'user_id': current_user.id} for task in tasks],
+        )
+        task_models = task_models.all()
+        await touch_tasks(session, current_user.id)
+        await task_events.publish(session, current_user.id, 'created', task_models)
+        await session.commit()
+    return {
+        'results': [
+            {'id': task_model.id, 'status': 'created', 'task': task_model}
+            for task_model in task_models
+        ]
+    }
+
+
+@router.patch('/bulk', response_model=schemas.TaskBulkResultList)
+async def update_tasks_bulk(
+    tasks: Annotated[
+        list[schemas.TaskBulkUpdate], Body(min_length=1, max_length=BULK_MAX_ITEMS)
+    ],
+    current_user: T_CurrentUser,
+    session: T_Session,
+):
+    owned_ids = await session.scalars(
+        select(Task.id).where(
+            Task.user_id == current_user.id,
+            Task.id.in_({task.id for task in tasks}),
+        )
+    )
+    owned_ids = set(owned_ids)
+    changes = [
+        task.model_dump(exclude_unset=True) for task in tasks if task.id in owned_ids
+    ]
+    if changes:
+        await session.execute(update(Task), changes)
+    task_models = await session.scalars(
+        select(Task)
+        .where(Task.id.in_(owned_ids))
+        .execution_options(populate_existing=True)
+    )
+    task_models = {task_model.id: task_model for task_model in task_models}
+    if task_models:
+        await touch_tasks(session, current_user.id)
+        await task_events.publish(
+            session, current_user.id, 'updated', task_models.values()
+        )
+    await session.commit()
+    return {
+        'results': [
+            {'id': task.id, 'status': 'updated', 'task': task_models[task.id]}
+            if task.id in task_models
+            else {'id': task.id, 'status': 'not_found'}
+            for task in tasks
+        ]
+    }
+
+
+@router.delete('/bulk', response_model=schemas.TaskBulkResultList)
+async def delete_tasks_bulk(
+    task_ids: Annotated[list[int], Body(min_length=1, max_length=BULK_MAX_ITEMS)],
+    current_user: T_CurrentUser,
+    session: T_Session,
+):
+    deleted_ids = await session.scalars(
+        delete(Task)
+        .where(Task.user_id == current_user.id, Task.id.in_(set(task_ids)))
+        .returning(Task.id)
+    )
+    deleted_ids = set(deleted_ids)
+    if deleted_ids:
+        await session.execute(
+            insert(TaskTombstone),
+            [
+                {'task_id': task_id, 'user_id': current_user.id}
+                for task_id in deleted_ids
+            ],
+        )
+        await touch_tasks(session, current_user.id)
+        await task_events.publish(
+            session, current_user.id, 'deleted', ids=sorted(deleted_ids)
+        )
+    await session.commit()
+    return {
+        'results': [
+            {
+                'id': task_id,
+                'status': 'deleted' if task_id in deleted_ids else 'not_found',
+            }
+            for task_id in task_ids
+        ]
+    }
 
 
 @router.patch('/{task_id}', response_model=schemas.TaskPublic)
@@ -62,28 +453,35 @@ async def update_task(
     task: schemas.TaskUpdate,
 ):
     task_model = await session.scalar(
-        select(Task).where(Task.user_id == current_user.id, Task.id == task_id)
+        update(Task)
+        .where(Task.user_id == current_user.id, Task.id == task_id)
+        .values(**task.model_dump(exclude_unset=True))
+        .returning(Task)
     )
     if task_model is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Task not found.')
-    for key, value in task.model_dump(exclude_unset=True).items():
-        setattr(task_model, key, value)
-    session.add(task_model)
+    await touch_tasks(session, current_user.id)
+    await task_events.publish(session, current_user.id, 'updated', [task_model])
     await session.commit()
-    await session.refresh(task_model)
     return task_model
 
 
 @router.delete('/{task_id}', response_model=schemas.Message)
 async def delete_task(task_id: int, session: T_Session, current_user: T_CurrentUser):
-    task = await session.scalar(
-        select(Task).where(Task.user_id == current_user.id, Task.id == task_id)
+    deleted_id = await session.scalar(
+        delete(Task)
+        .where(Task.user_id == current_user.id, Task.id == task_id)
+        .returning(Task.id)
     )
-    if task is None:
+    if deleted_id is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='Task not found.',
         )
-    await session.delete(task)
+    await session.execute(
+        insert(TaskTombstone).values(task_id=deleted_id, user_id=current_user.id)
+    )
+    await touch_tasks(session, current_user.id)
+    await task_events.publish(session, current_user.id, 'deleted', ids=[deleted_id])
     await session.commit()
     return {'message': 'Task has been deleted successfully.'}
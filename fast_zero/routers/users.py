@@ -1,39 +1,59 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero import schemas
+from fast_zero.conditional import not_modified, validators, weak_etag
 from fast_zero.database import get_session
+from fast_zero.loading import USER_IDENTITY, USER_PUBLIC_COLUMNS
 from fast_zero.models import User
-from fast_zero.security import get_current_user, get_password_hash
+from fast_zero.pagination import next_cursor, paginate
+from fast_zero.refresh_tokens import (
+    delete_user_refresh_tokens,
+    revoke_user_refresh_tokens,
+)
+from fast_zero.responses import json_response, rows_response
+from fast_zero.security import (
+    Principal,
+    get_current_user,
+    get_password_hash_async,
+    principal_cache,
+)
 
 router = APIRouter(prefix='/users', tags=['users'])
 
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_CurrentUser = Annotated[Principal, Depends(get_current_user)]
 T_FilterPage = Annotated[schemas.FilterPage, Query()]
 
 
 @router.get('/', response_model=schemas.UserList)
 async def get_users(filter_page: T_FilterPage, session: T_Session):
-    query = await session.scalars(
-        select(User).offset(filter_page.offset).limit(filter_page.limit)
+    query = await session.execute(
+        paginate(select(*USER_PUBLIC_COLUMNS), User.id, filter_page)
     )
     users = query.all()
-    return {'users': users}
+    return rows_response('users', users, next_cursor(users, filter_page))
 
 
 @router.get('/{user_id}', response_model=schemas.UserPublic)
-async def get_user(user_id: int, session: T_Session):
-    user = await session.get(User, user_id)
-    if user:
-        return user
-    else:
+async def get_user(user_id: int, request: Request, session: T_Session):
+    user = await session.execute(
+        select(*USER_PUBLIC_COLUMNS, User.updated_at).where(User.id == user_id)
+    )
+    user = user.one_or_none()
+    if user is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='User not found')
+    user = user._asdict()
+    updated_at = user.pop('updated_at')
+    etag = weak_etag(1, updated_at)
+    if response := not_modified(request, etag, updated_at):
+        return response
+    return json_response(user, headers=validators(etag, updated_at))
 
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=schemas.UserPublic)
@@ -41,7 +61,7 @@ async def create_user(user: schemas.User, session: T_Session):
     query = select(User).where(
         (User.username == user.username) | (User.email == user.email)
     )
-    user_model = await session.scalar(query)
+    user_model = await session.scalar(query.options(*USER_IDENTITY))
     if user_model and user.username == user_model.username:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST, detail='Username already exists'
@@ -52,12 +72,11 @@ async def create_user(user: schemas.User, session: T_Session):
         )
     user_model = User(
         username=user.username,
-        password=get_password_hash(user.password),
+        password=await get_password_hash_async(user.password),
         email=user.email,
     )
     session.add(user_model)
     await session.commit()
-    await session.refresh(user_model)
     return user_model
 
 
@@ -72,18 +91,25 @@ async def update_user(
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
+    user_model = await session.get(User, user_id, options=USER_IDENTITY)
+    if not user_model:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='User not found')
     try:
-        current_user.username = user.username
-        current_user.password = get_password_hash(user.password)
-        current_user.email = user.email
+        user_model.username = user.username
+        user_model.password = await get_password_hash_async(user.password)
+        user_model.email = user.email
+        user_model.token_version = User.token_version + 1
+        await revoke_user_refresh_tokens(session, user_id)
         await session.commit()
-        await session.refresh(current_user)
+        await session.refresh(user_model)
     except IntegrityError:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Username or Email already exists',
         )
-    return current_user
+    finally:
+        principal_cache.pop(current_user.id)
+    return user_model
 
 
 @router.delete('/{user_id}', response_model=schemas.Message)
@@ -96,6 +122,13 @@ async def delete_user(
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
-    await session.delete(current_user)
+    user_model = await session.get(User, user_id, options=USER_IDENTITY)
+    if not user_model:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='User not found')
+    # refresh_tokens.user_id cascades on delete, but SQLite only enforces
+    # foreign keys when asked to per connection, which the app doesn't do.
+    await delete_user_refresh_tokens(session, user_id)
+    await session.delete(user_model)
     await session.commit()
+    principal_cache.pop(current_user.id)
     return {'message': 'User deleted'}
@@ -1,6 +1,23 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    field_validator,
+    model_validator,
+)
 
 from fast_zero.models import TaskState
+from fast_zero.pagination import (
+    decode_change_cursor,
+    decode_id_cursor,
+    naive_utc,
+)
+
+CHANGES_MAX_LIMIT = 1000
 
 
 class Message(BaseModel):
@@ -22,16 +39,30 @@ class UserPublic(BaseModel):
 
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class FilterPage(BaseModel):
     offset: int = 0
     limit: int = 100
+    cursor: str | None = None
+
+    @field_validator('cursor')
+    @classmethod
+    def validate_cursor(cls, cursor: str | None):
+        if cursor is not None:
+            decode_id_cursor(cursor)
+        return cursor
 
 
 class Task(BaseModel):
@@ -39,6 +70,14 @@ class Task(BaseModel):
     description: str
     state: TaskState
 
+    @field_validator('title', 'description')
+    @classmethod
+    def validate_text(cls, value: str):
+        # Postgres text cannot store NUL, so it would fail the whole write.
+        if '\x00' in value:
+            raise ValueError('Must not contain NUL characters')
+        return value
+
 
 class TaskPublic(Task):
     id: int
@@ -46,15 +85,82 @@ class TaskPublic(Task):
 
 class TaskList(BaseModel):
     tasks: list[TaskPublic]
+    next_cursor: str | None = None
 
 
-class FilterTask(FilterPage):
+class TaskFilters(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TaskState | None = None
+    search: str | None = None
+
+
+class FilterTask(FilterPage, TaskFilters):
+    @model_validator(mode='after')
+    def validate_search_pagination(self):
+        if self.search and self.cursor:
+            raise ValueError('Ranked search results are paginated with offset')
+        return self
+
+
+class FilterTaskExport(TaskFilters):
+    model_config = ConfigDict(extra='forbid')
+    format: Literal['ndjson', 'csv'] = 'ndjson'
+
+
+class FilterTaskChanges(BaseModel):
+    since: datetime | None = None
+    cursor: str | None = None
+    limit: int = Field(100, gt=0, le=CHANGES_MAX_LIMIT)
+
+    @field_validator('since')
+    @classmethod
+    def validate_since(cls, since: datetime | None):
+        if since is not None:
+            return naive_utc(since)
+        return since
+
+    @field_validator('cursor')
+    @classmethod
+    def validate_cursor(cls, cursor: str | None):
+        if cursor is not None:
+            decode_change_cursor(cursor)
+        return cursor
+
+
+class TaskChanges(BaseModel):
+    tasks: list[TaskPublic]
+    deleted: list[int]
+    watermark: datetime | None
+    next_cursor: str | None = None
 
 
 class TaskUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TaskState | None = None
+
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBulkResult(BaseModel):
+    id: int
+    status: Literal['created', 'updated', 'deleted', 'not_found']
+    task: TaskPublic | None = None
+
+
+class TaskBulkResultList(BaseModel):
+    results: list[TaskBulkResult]
+
+
+class TaskImportError(BaseModel):
+    line: int
+    errors: list[dict[str, Any]]
+
+
+class TaskImportResult(BaseModel):
+    imported: int
+    rejected: int
+    errors: list[TaskImportError]
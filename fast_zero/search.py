@@ -0,0 +1,22 @@
+import re
+
+from sqlalchemy import func, or_
+
+from fast_zero.models import TASK_SEARCH_CONFIG, Task, task_search_vector
+
+
+def search_tasks(query, terms: str, dialect_name: str):
+    words = re.findall(r'\w+', terms)
+    if not words:
+        return query
+    if dialect_name == 'postgresql':
+        prefixes = ' & '.join(f'{word}:*' for word in words)
+        ts_query = func.to_tsquery(TASK_SEARCH_CONFIG, prefixes)
+        return query.where(task_search_vector.op('@@')(ts_query)).order_by(
+            func.ts_rank(task_search_vector, ts_query).desc()
+        )
+    for word in words:
+        query = query.where(
+            or_(Task.title.icontains(word), Task.description.icontains(word))
+        )
+    return query
@@ -1,4 +1,8 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import cache
 from http import HTTPStatus
 from zoneinfo import ZoneInfo
 
@@ -9,19 +13,107 @@ from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import TTLCache
 from fast_zero.database import get_session
+from fast_zero.metrics import Counter, Gauge, register_cache_metrics, registry
 from fast_zero.models import User
-from fast_zero.settings import Settings
+from fast_zero.settings import Settings, get_settings
 
 pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 
-settings = Settings()
+principal_cache = TTLCache(
+    maxsize=get_settings().PRINCIPAL_CACHE_MAXSIZE,
+    ttl=get_settings().PRINCIPAL_CACHE_TTL_SECONDS,
+)
+register_cache_metrics('principal_cache', principal_cache)
+
+
+class PasswordHashPool:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='password-hash'
+        )
+
+    @property
+    def queue_depth(self):
+        return max(self.in_flight - self.max_workers, 0)
+
+    async def run(self, func, *args):
+        if self.queue_depth >= self.max_queue:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Server is busy, try again later',
+                headers={'Retry-After': '1'},
+            )
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=get_settings().PASSWORD_HASH_WORKERS,
+    max_queue=get_settings().PASSWORD_HASH_MAX_QUEUE,
+)
+registry.register(
+    Gauge(
+        'password_hash_queue_depth',
+        'Password hashes waiting for a worker thread',
+        func=lambda: password_hash_pool.queue_depth,
+    )
+)
+auth_failures = registry.register(
+    Counter('auth_failures_total', 'Rejected bearer tokens', ('reason',))
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    email: str
+    username: str
+    token_version: int
+
+
+async def _load_principal(session: AsyncSession, criterion):
+    user = await session.execute(
+        select(User.id, User.email, User.username, User.token_version).where(criterion)
+    )
+    user = user.one_or_none()
+    if user is None:
+        return None
+    return Principal(**user._asdict())
+
+
+async def load_principal(session: AsyncSession, user_id: int) -> Principal | None:
+    principal = await _load_principal(session, User.id == user_id)
+    if principal:
+        principal_cache.set(user_id, principal)
+    else:
+        principal_cache.pop(user_id)
+    return principal
+
+
+def principal_gone(user_id: int) -> HTTPException:
+    principal_cache.pop(user_id)
+    auth_failures.inc('unknown_user')
+    return HTTPException(
+        status_code=HTTPStatus.UNAUTHORIZED,
+        detail='Could not validate credentials',
+        headers={'WWW-Authenticate': 'Bearer'},
+    )
 
 
 async def get_current_user(
     session: AsyncSession = Depends(get_session),
     token: str = Depends(oauth2_scheme),
+    settings: Settings = Depends(get_settings),
 ):
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
@@ -32,19 +124,35 @@ async def get_current_user(
         payload = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         subject_email = payload.get('sub')
         if not subject_email:
+            auth_failures.inc('invalid')
             raise credentials_exception
     except ExpiredSignatureError:
+        auth_failures.inc('expired')
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Token expired',
             headers={'WWW-Authenticate': 'Bearer'},
         )
     except DecodeError:
+        auth_failures.inc('invalid')
+        raise credentials_exception
+    user_id = payload.get('uid')
+    token_version = payload.get('ver', 0)
+    if user_id is None:
+        principal = await _load_principal(session, User.email == subject_email)
+    else:
+        principal = principal_cache.get(user_id)
+        if principal is None or principal.token_version < token_version:
+            principal = await _load_principal(session, User.id == user_id)
+            if principal:
+                principal_cache.set(user_id, principal)
+    if not principal:
+        auth_failures.inc('unknown_user')
         raise credentials_exception
-    user = await session.scalar(select(User).where(User.email == subject_email))
-    if not user:
+    if principal.token_version != token_version:
+        auth_failures.inc('revoked')
         raise credentials_exception
-    return user
+    return principal
 
 
 def get_password_hash(password: str):
@@ -55,11 +163,37 @@ def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def create_access_token(data: dict):
-    to_encode = data.copy()
+async def get_password_hash_async(password: str):
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await password_hash_pool.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+def create_access_token(principal, settings: Settings | None = None):
+    settings = settings or get_settings()
+    to_encode = {
+        'sub': principal.email,
+        'uid': principal.id,
+        'ver': principal.token_version,
+    }
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode.update({'exp': expire})
     encoded_jwt = encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+
+@cache
+def _prime_password_hasher():
+    verify_password('warm-up', get_password_hash('warm-up'))
+
+
+async def warm_up_security(settings: Settings):
+    token = create_access_token(Principal(0, 'warm-up', 'warm-up', 0), settings)
+    decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    await password_hash_pool.run(_prime_password_hasher)
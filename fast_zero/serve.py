@@ -0,0 +1,39 @@
+import os
+
+from uvicorn import Config, Server
+from uvicorn.supervisors import Multiprocess
+
+from fast_zero.settings import Settings, get_settings
+
+
+def worker_count(settings: Settings) -> int:
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS
+    return os.process_cpu_count() or 1
+
+
+def server_config(settings: Settings) -> Config:
+    return Config(
+        'fast_zero.app:app',
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=worker_count(settings),
+        loop='auto',
+        http='auto',
+        lifespan='on',
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True,
+    )
+
+
+def main():  # pragma: no cover
+    config = server_config(get_settings())
+    server = Server(config)
+    # The supervisor restarts workers one by one on SIGHUP, even with one worker.
+    Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
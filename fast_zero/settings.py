@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,3 +10,35 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_SWEEP_SECONDS: float = 3600.0
+    REFRESH_TOKEN_DENYLIST_MAXSIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAXSIZE: int = 10_000
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 256
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_STATEMENT_CACHE_SIZE: int = 500
+    DATABASE_WARMUP_CONNECTIONS: int = 2
+    FAST_JSON_RESPONSES: bool = True
+    REQUEST_INSTRUMENTATION_SAMPLE_RATE: float = 0.0
+    TASK_EVENTS_BACKEND: Literal['memory', 'postgres'] = 'memory'
+    TASK_EVENTS_QUEUE_SIZE: int = 100
+    TASK_CHANGES_SAFETY_LAG_SECONDS: float = 5.0
+    TASK_TOMBSTONE_RETENTION_DAYS: int = 30
+    TASK_TOMBSTONE_PRUNE_SECONDS: float = 3600.0
+    SERVER_HOST: str = '0.0.0.0'
+    SERVER_PORT: int = 8080
+    SERVER_WORKERS: int | None = None
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 65
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -0,0 +1,44 @@
+"""utc timestamp defaults
+
+Revision ID: 3e8b5d1c7a20
+Revises: c7d2a9e4f1b6
+Create Date: 2026-10-18 22:40:31.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8b5d1c7a20'
+down_revision: Union[str, None] = 'c7d2a9e4f1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = [
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+    ('tasks', 'created_at'),
+    ('tasks', 'updated_at'),
+    ('task_tombstones', 'deleted_at'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite's CURRENT_TIMESTAMP is already UTC, only Postgres follows the
+    # session TimeZone.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=sa.text("timezone('UTC', now())"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=sa.text('now()'))
@@ -0,0 +1,38 @@
+"""task search index
+
+Revision ID: 9a4e2b6c1f3d
+Revises: 5c1f0e7a9d42
+Create Date: 2026-10-18 11:02:47.918322
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e2b6c1f3d'
+down_revision: Union[str, None] = '5c1f0e7a9d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_index(
+        'ix_tasks_search',
+        'tasks',
+        [sa.text("to_tsvector('simple', (title || ' ') || description)")],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_tasks_search', table_name='tasks', postgresql_using='gin')
@@ -12,7 +12,7 @@ from testcontainers.postgres import PostgresContainer
 from fast_zero.app import app
 from fast_zero.database import get_session
 from fast_zero.models import User, table_registry
-from fast_zero.security import get_password_hash
+from fast_zero.security import get_password_hash, principal_cache
 
 
 class UserFactory(factory.Factory):
@@ -34,6 +34,7 @@ def client(session):
         yield c
 
     app.dependency_overrides.clear()
+    principal_cache.clear()
 
 
 @pytest.fixture(scope='session')
@@ -70,6 +71,22 @@ def mock_db_time():
     return _mock_db_time
 
 
+@pytest.fixture
+def count_statements(engine):
+    @contextmanager
+    def _count_statements():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+        yield statements
+        event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+
+    return _count_statements
+
+
 @pytest_asyncio.fixture
 async def user(session):
     password = 'testtest'
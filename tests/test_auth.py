@@ -1,6 +1,33 @@
 from http import HTTPStatus
 
+import pytest
 from freezegun import freeze_time
+from jwt import decode
+from sqlalchemy import select, update
+
+from fast_zero.models import RefreshToken, User
+from fast_zero.refresh_tokens import (
+    hash_refresh_token,
+    issue_refresh_token,
+    revoked_refresh_tokens,
+    rotate_refresh_token,
+    sweep_refresh_tokens,
+)
+from fast_zero.settings import get_settings
+
+
+@pytest.fixture
+def tokens(client, user):
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.cleaned_password},
+    )
+    return response.json()
+
+
+@pytest.fixture
+def refresh_token(tokens):
+    return tokens['refresh_token']
 
 
 def test_get_token(client, user):
@@ -12,6 +39,7 @@ def test_get_token(client, user):
     assert response.status_code == HTTPStatus.OK
     assert 'access_token' in token
     assert 'token_type' in token
+    assert 'refresh_token' in token
 
 
 def test_incorrect_email(client, user):
@@ -54,31 +82,152 @@ def test_token_expired_after_time(client, user):
         assert response.json() == {'detail': 'Token expired'}
 
 
-def test_refresh_token(client, user, token):
-    response = client.post(
-        '/auth/refresh_token',
-        headers={'Authorization': f'Bearer {token}'},
-    )
+def test_refresh_token(client, refresh_token):
+    response = client.post('/auth/refresh_token', json={'refresh_token': refresh_token})
     data = response.json()
     assert response.status_code == HTTPStatus.OK
     assert 'access_token' in data
-    assert 'token_type' in data
     assert data['token_type'] == 'Bearer'
+    assert data['refresh_token'] != refresh_token
+    response = client.get(
+        '/tasks/', headers={'Authorization': f'Bearer {data["access_token"]}'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_refresh_token_is_single_use(client, refresh_token):
+    response = client.post('/auth/refresh_token', json={'refresh_token': refresh_token})
+    rotated = response.json()['refresh_token']
+
+    response = client.post('/auth/refresh_token', json={'refresh_token': refresh_token})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Invalid refresh token'}
+
+    response = client.post('/auth/refresh_token', json={'refresh_token': rotated})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
 
 
-def test_token_expired_dont_refresh(client, user):
+def test_unknown_refresh_token(client):
+    response = client.post('/auth/refresh_token', json={'refresh_token': 'nope'})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Invalid refresh token'}
+
+
+def test_refresh_token_expired_dont_refresh(client, user):
     with freeze_time('2023-07-14 12:00:00'):
         response = client.post(
             '/auth/token',
             data={'username': user.email, 'password': user.cleaned_password},
         )
-        assert response.status_code == HTTPStatus.OK
-        token = response.json()['access_token']
+        refresh_token = response.json()['refresh_token']
 
-    with freeze_time('2023-07-14 12:31:00'):
+    with freeze_time('2023-08-14 12:00:00'):
         response = client.post(
-            '/auth/refresh_token',
-            headers={'Authorization': f'Bearer {token}'},
+            '/auth/refresh_token', json={'refresh_token': refresh_token}
         )
         assert response.status_code == HTTPStatus.UNAUTHORIZED
-        assert response.json() == {'detail': 'Token expired'}
+
+
+def test_password_change_revokes_refresh_tokens(client, user, token, refresh_token):
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'bob', 'email': 'bob@example.com', 'password': 'secret'},
+    )
+    response = client.post('/auth/refresh_token', json={'refresh_token': refresh_token})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_rotation_is_denylisted_only_after_commit(session, refresh_token):
+    settings = get_settings()
+    token_hash = hash_refresh_token(refresh_token)
+    assert await rotate_refresh_token(session, refresh_token, settings) is not None
+    await session.rollback()
+    assert revoked_refresh_tokens.get(token_hash) is None
+
+    assert await rotate_refresh_token(session, refresh_token, settings) is not None
+    await session.commit()
+    assert revoked_refresh_tokens.get(token_hash) is not None
+
+
+def test_refresh_statements(client, tokens, count_statements):
+    expected_statements = 3
+    client.get('/tasks/', headers={'Authorization': f'Bearer {tokens["access_token"]}'})
+    with count_statements() as statements:
+        client.post(
+            '/auth/refresh_token', json={'refresh_token': tokens['refresh_token']}
+        )
+    assert len(statements) == expected_statements
+    assert statements[0].startswith('UPDATE refresh_tokens')
+    assert 'FROM users' in statements[1]
+    assert statements[2].startswith('INSERT INTO refresh_tokens')
+
+
+@pytest.mark.asyncio
+async def test_refresh_reloads_principal(client, session, user, tokens):
+    client.get('/tasks/', headers={'Authorization': f'Bearer {tokens["access_token"]}'})
+    await session.execute(update(User).values(token_version=User.token_version + 1))
+    await session.commit()
+
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': tokens['refresh_token']}
+    )
+
+    settings = get_settings()
+    access_token = response.json()['access_token']
+    decoded = decode(access_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert decoded['ver'] == 1
+    response = client.get(
+        '/tasks/', headers={'Authorization': f'Bearer {access_token}'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_delete_user_deletes_refresh_tokens(client, session, user, tokens):
+    client.delete(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {tokens["access_token"]}'},
+    )
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': tokens['refresh_token']}
+    )
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    remaining = await session.scalars(select(RefreshToken))
+    assert remaining.all() == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_for_missing_user_revokes_family(
+    session, user, refresh_token, monkeypatch
+):
+    async def no_principal(session, user_id):
+        return None
+
+    settings = get_settings()
+    family = await session.scalar(select(RefreshToken.family))
+    await issue_refresh_token(session, user.id, settings, family)
+    monkeypatch.setattr('fast_zero.refresh_tokens.load_principal', no_principal)
+
+    assert await rotate_refresh_token(session, refresh_token, settings) is None
+    await session.commit()
+    revoked = await session.scalars(select(RefreshToken.revoked_at))
+    assert None not in revoked.all()
+
+
+@pytest.mark.asyncio
+async def test_sweep_refresh_tokens(session, client, user):
+    with freeze_time('2023-07-14 12:00:00'):
+        client.post(
+            '/auth/token',
+            data={'username': user.email, 'password': user.cleaned_password},
+        )
+    client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.cleaned_password},
+    )
+
+    assert await sweep_refresh_tokens(session) == 1
+    remaining = await session.scalars(select(RefreshToken))
+    assert len(remaining.all()) == 1
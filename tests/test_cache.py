@@ -0,0 +1,38 @@
+from freezegun import freeze_time
+
+from fast_zero.cache import TTLCache
+
+
+def test_cache_get_counts_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 10}
+
+
+def test_cache_entry_expires_after_ttl():
+    with freeze_time('2024-01-01 12:00:00') as frozen_time:
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set('a', 1)
+        frozen_time.tick(61)
+        assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 'first')
+    cache.set('b', 'second')
+    cache.get('a')
+    cache.set('c', 'third')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'first'
+    assert cache.get('c') == 'third'
+
+
+def test_cache_pop():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    assert cache.pop('a') == 1
+    assert cache.pop('a') is None
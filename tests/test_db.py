@@ -1,10 +1,20 @@
 from dataclasses import asdict
+from datetime import datetime
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import exc, insert, inspect, select, text
 from sqlalchemy.exc import DataError
 
-from fast_zero.models import Task, User
+from fast_zero.database import (
+    InstrumentedQueuePool,
+    PoolMetrics,
+    create_engine,
+    warm_up_pool,
+)
+from fast_zero.loading import USER_IDENTITY, USER_WITH_TASKS
+from fast_zero.models import Task, TaskState, User
+from fast_zero.search import search_tasks
+from fast_zero.settings import Settings
 
 
 @pytest.mark.asyncio
@@ -13,12 +23,17 @@ async def test_create_user(session, mock_db_time):
         new_user = User(username='alice', password='secret', email='teste@test')
         session.add(new_user)
         await session.commit()
-        user = await session.scalar(select(User).where(User.username == 'alice'))
+        user = await session.scalar(
+            select(User).where(User.username == 'alice').options(*USER_WITH_TASKS)
+        )
         assert asdict(user) == {
             'id': 1,
             'username': 'alice',
             'password': 'secret',
             'email': 'teste@test',
+            'token_version': 0,
+            'tasks_version': 0,
+            'tasks_changed_at': None,
             'tasks': [],
             'created_at': time,
             'updated_at': time,
@@ -58,11 +73,30 @@ async def test_user_task_relationship(session, user):
     )
     session.add(task)
     await session.commit()
-    await session.refresh(user)
-    user = await session.scalar(select(User).where(User.id == user.id))
+    user = await session.scalar(
+        select(User).where(User.id == user.id).options(*USER_WITH_TASKS)
+    )
     assert user.tasks == [task]
 
 
+@pytest.mark.asyncio
+async def test_user_identity_does_not_load_tasks(session, user):
+    session.add(
+        Task(
+            title='Test Task',
+            description='Test Desc',
+            state='draft',
+            user_id=user.id,
+        )
+    )
+    await session.commit()
+    session.expunge_all()
+    user = await session.scalar(
+        select(User).where(User.id == user.id).options(*USER_IDENTITY)
+    )
+    assert 'tasks' not in inspect(user).dict
+
+
 @pytest.mark.asyncio
 async def test_task_wrong_task_state(session, user):
     task = Task(
@@ -74,3 +108,141 @@ async def test_task_wrong_task_state(session, user):
     session.add(task)
     with pytest.raises(DataError):
         await session.commit()
+
+
+async def _explain(session, query):
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={'literal_binds': True}
+    )
+    plan = await session.scalars(text(f'EXPLAIN {compiled}'))
+    return '\n'.join(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('query', 'index_name'),
+    [
+        (
+            select(Task).where(Task.user_id == 1).order_by(Task.id).limit(10),
+            'ix_tasks_user_id_id',
+        ),
+        (
+            select(Task)
+            .where(Task.user_id == 1, Task.state == TaskState.done)
+            .order_by(Task.id)
+            .limit(10),
+            'ix_tasks_user_id_state_id',
+        ),
+        (
+            select(Task)
+            .where(Task.user_id == 1, Task.updated_at > datetime(2024, 1, 1))
+            .order_by(Task.updated_at, Task.id)
+            .limit(10),
+            'ix_tasks_user_id_updated_at_id',
+        ),
+    ],
+)
+async def test_task_queries_use_user_indexes(session, user, query, index_name):
+    user_ids = await session.scalars(
+        insert(User).returning(User.id),
+        [
+            {'username': f'seed{number}', 'email': f'seed{number}@test', 'password': ''}
+            for number in range(19)
+        ],
+    )
+    await session.execute(
+        insert(Task),
+        [
+            {
+                'title': f'Task {number}',
+                'description': 'Test Desc',
+                'state': list(TaskState)[number % len(TaskState)],
+                'user_id': user_id,
+            }
+            for user_id in [user.id, *user_ids]
+            for number in range(200)
+        ],
+    )
+    await session.commit()
+    await session.execute(text('ANALYZE tasks'))
+    assert index_name in await _explain(session, query)
+
+
+@pytest.mark.asyncio
+async def test_task_search_uses_search_index(session, user):
+    await session.execute(
+        insert(Task),
+        [
+            {
+                'title': 'Urgent task' if number % 100 == 0 else f'Task {number}',
+                'description': 'Test Desc',
+                'state': TaskState.todo,
+                'user_id': user.id,
+            }
+            for number in range(4000)
+        ],
+    )
+    await session.commit()
+    await session.execute(text('ANALYZE tasks'))
+    query = search_tasks(
+        select(Task).where(Task.user_id == user.id), 'urg', 'postgresql'
+    )
+    assert 'ix_tasks_search' in await _explain(session, query.limit(10))
+
+
+@pytest.fixture
+def pool_settings(tmp_path):
+    return Settings(
+        DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path / "pool.sqlite3"}',
+        DATABASE_POOL_SIZE=1,
+        DATABASE_MAX_OVERFLOW=0,
+        DATABASE_POOL_TIMEOUT=0.01,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_engine_applies_pool_settings(pool_settings):
+    metrics = PoolMetrics()
+    engine = create_engine(pool_settings, metrics)
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    async with engine.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+        stats = metrics.snapshot(engine.pool)
+        assert stats['checked_out'] == 1
+        assert stats['size'] == 1
+    await engine.dispose()
+    stats = metrics.snapshot(engine.pool)
+    assert stats['checked_out'] == 0
+    assert stats['checkouts'] == 1
+    assert stats['wait_seconds']['count'] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_count_timeouts(pool_settings):
+    expected_waits = 2
+    metrics = PoolMetrics()
+    engine = create_engine(pool_settings, metrics)
+    async with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect().start()
+    await engine.dispose()
+    assert metrics.timeouts == 1
+    assert metrics.wait_seconds.count == expected_waits
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool_opens_connections(pool_settings):
+    expected_connections = 3
+    pool_settings.DATABASE_POOL_SIZE = expected_connections
+    metrics = PoolMetrics()
+    engine = create_engine(pool_settings, metrics)
+    await warm_up_pool(engine, expected_connections)
+    assert metrics.connects == expected_connections
+    assert engine.pool.checkedin() == expected_connections
+    await engine.dispose()
+
+
+def test_create_engine_for_memory_database():
+    settings = Settings(DATABASE_URL='sqlite+aiosqlite:///:memory:')
+    engine = create_engine(settings, PoolMetrics())
+    assert not isinstance(engine.pool, InstrumentedQueuePool)
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.database import PENDING_ON_COMMIT_KEY
+from fast_zero.events import (
+    PostgresTaskEventBroker,
+    TaskEventBroker,
+    event_stream,
+    task_event,
+    task_events,
+)
+
+
+@pytest.mark.asyncio
+async def test_broker_delivers_only_to_the_user_subscribers(session):
+    broker = TaskEventBroker(max_queue=10)
+    queue = await broker.subscribe(1)
+    other_queue = await broker.subscribe(2)
+    await broker.publish(session, 1, 'deleted', ids=[5])
+    assert queue.empty()
+    await session.commit()
+    assert queue.get_nowait() == {'type': 'deleted', 'ids': [5]}
+    assert other_queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_broker_discards_events_on_rollback(session):
+    broker = TaskEventBroker(max_queue=10)
+    queue = await broker.subscribe(1)
+    await session.execute(text('SELECT 1'))
+    await broker.publish(session, 1, 'deleted', ids=[5])
+    await session.rollback()
+    await session.commit()
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_broker_skips_events_without_subscribers(session, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr('fast_zero.events.task_event', fail)
+    broker = TaskEventBroker(max_queue=10)
+    await broker.publish(session, 1, 'created', [object()])
+    assert PENDING_ON_COMMIT_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_broker_drops_slow_consumers(session):
+    broker = TaskEventBroker(max_queue=2)
+    slow_queue = await broker.subscribe(1)
+    for task_id in range(3):
+        await broker.publish(session, 1, 'deleted', ids=[task_id])
+    await session.commit()
+    assert slow_queue.get_nowait() is None
+    assert slow_queue.empty()
+    assert broker.subscriber_count == 0
+    assert broker.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_events_formats_sse_and_unsubscribes():
+    unsubscribed = []
+    queue = asyncio.Queue()
+    queue.put_nowait(task_event('deleted', ids=[1]))
+    queue.put_nowait(None)
+    chunks = [
+        chunk async for chunk in event_stream(queue, lambda: unsubscribed.append(True))
+    ]
+    assert chunks == [
+        b'event: deleted\ndata: {"type":"deleted","ids":[1]}\n\n',
+        b'event: dropped\ndata: {}\n\n',
+    ]
+    assert unsubscribed == [True]
+
+
+@pytest.mark.asyncio
+async def test_task_endpoints_publish_events(client, user, token):
+    queue = await task_events.subscribe(user.id)
+    headers = {'Authorization': f'Bearer {token}'}
+    try:
+        response = client.post(
+            '/tasks/',
+            headers=headers,
+            json={'title': 'Test', 'description': 'Test', 'state': 'todo'},
+        )
+        task = response.json()
+        client.patch(f'/tasks/{task["id"]}', headers=headers, json={'state': 'done'})
+        client.delete(f'/tasks/{task["id"]}', headers=headers)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+    finally:
+        task_events.unsubscribe(user.id, queue)
+    assert events == [
+        {'type': 'created', 'ids': [task['id']], 'tasks': [task]},
+        {'type': 'updated', 'ids': [task['id']], 'tasks': [{**task, 'state': 'done'}]},
+        {'type': 'deleted', 'ids': [task['id']]},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_postgres_broker_fans_out_notifications(engine):
+    broker = PostgresTaskEventBroker(
+        max_queue=10, database_url=engine.url.render_as_string(hide_password=False)
+    )
+    queue = await broker.subscribe(1)
+    try:
+        async with AsyncSession(engine) as session:
+            await broker.publish(session, 1, 'deleted', ids=[7])
+            await broker.publish(session, 2, 'deleted', ids=[8])
+            await asyncio.sleep(0.1)
+            assert queue.empty()
+            await session.commit()
+        event = await asyncio.wait_for(queue.get(), timeout=5)
+    finally:
+        await broker.close()
+    assert event == {'type': 'deleted', 'ids': [7]}
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_postgres_broker_skips_malformed_notifications(engine):
+    broker = PostgresTaskEventBroker(
+        max_queue=10, database_url=engine.url.render_as_string(hide_password=False)
+    )
+    queue = await broker.subscribe(1)
+    try:
+        async with AsyncSession(engine) as session:
+            await session.execute(text("NOTIFY task_events, 'not json'"))
+            await broker.publish(session, 1, 'deleted', ids=[7])
+            await session.commit()
+        event = await asyncio.wait_for(queue.get(), timeout=5)
+    finally:
+        await broker.close()
+    assert event == {'type': 'deleted', 'ids': [7]}
+
+
+@pytest.mark.asyncio
+async def test_postgres_broker_drops_subscribers_on_reconnect(engine):
+    broker = PostgresTaskEventBroker(
+        max_queue=10, database_url=engine.url.render_as_string(hide_password=False)
+    )
+    queue = await broker.subscribe(1)
+    try:
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                text(
+                    'SELECT pg_terminate_backend(pid) FROM pg_stat_activity'
+                    " WHERE query = 'LISTEN task_events'"
+                )
+            )
+        event = await asyncio.wait_for(queue.get(), timeout=5)
+    finally:
+        await broker.close()
+    assert event is None
+    assert broker.subscriber_count == 0
@@ -0,0 +1,38 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fast_zero.app import app
+
+
+@pytest.fixture
+def app_engine(engine, monkeypatch):
+    monkeypatch.setattr('fast_zero.app.engine', engine)
+    return engine
+
+
+def test_readiness_before_warm_up():
+    app.state.ready = False
+    response = TestClient(app).get('/health/ready')
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json() == {'detail': 'Warming up'}
+
+
+@pytest.mark.usefixtures('app_engine')
+def test_readiness_after_warm_up(client):
+    deadline = time.monotonic() + 5
+    response = client.get('/health/ready')
+    while response.status_code != HTTPStatus.OK and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get('/health/ready')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'message': 'Ready'}
+
+
+@pytest.mark.usefixtures('app_engine')
+def test_readiness_after_shutdown():
+    with TestClient(app):
+        pass
+    assert app.state.ready is False
@@ -0,0 +1,52 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fast_zero.app import app
+from fast_zero.database import get_session, instrument_engine
+from fast_zero.instrumentation import RequestInstrumentationMiddleware
+
+
+@pytest.fixture
+def instrumented_client(session, engine):
+    def client(sample_rate=1.0):
+        instrument_engine(engine)
+        app.dependency_overrides[get_session] = lambda: session
+        return TestClient(RequestInstrumentationMiddleware(app, sample_rate))
+
+    yield client
+    app.dependency_overrides.clear()
+
+
+def test_server_timing_reports_statements(instrumented_client, user, caplog):
+    caplog.set_level(logging.INFO, logger='fast_zero.instrumentation')
+    with instrumented_client() as client:
+        response = client.get(f'/users/{user.id}')
+
+    timing = response.headers['server-timing']
+    assert 'db;dur=' in timing
+    assert 'desc="1 statements"' in timing
+    assert 'app;dur=' in timing
+    (record,) = [
+        record
+        for record in caplog.records
+        if record.name == 'fast_zero.instrumentation'
+    ]
+    assert record.http_path == f'/users/{user.id}'
+    assert record.http_status == response.status_code
+    assert record.db_statements == 1
+    assert record.db_slowest_statement.startswith('SELECT')
+
+
+def test_unsampled_requests_are_not_timed(instrumented_client, user, caplog):
+    caplog.set_level(logging.INFO, logger='fast_zero.instrumentation')
+    with instrumented_client(sample_rate=0.0) as client:
+        response = client.get(f'/users/{user.id}')
+
+    assert 'server-timing' not in response.headers
+    assert not [
+        record
+        for record in caplog.records
+        if record.name == 'fast_zero.instrumentation'
+    ]
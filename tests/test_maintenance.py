@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.maintenance import run_exclusively
+
+
+@pytest.mark.asyncio
+async def test_run_exclusively_skips_when_another_worker_holds_the_lock(
+    engine, session
+):
+    runs = []
+
+    async def job(session):
+        runs.append(session)
+
+    async with AsyncSession(engine) as other_worker:
+        await other_worker.execute(select(func.pg_advisory_xact_lock(42)))
+        assert not await run_exclusively(session, 42, job)
+    await session.rollback()
+    assert await run_exclusively(session, 42, job)
+    assert runs == [session]
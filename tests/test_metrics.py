@@ -0,0 +1,112 @@
+import os
+from http import HTTPStatus
+
+from freezegun import freeze_time
+
+from fast_zero.cache import TTLCache
+from fast_zero.instrumentation import http_requests
+from fast_zero.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    HistogramFamily,
+    Registry,
+    register_cache_metrics,
+)
+from fast_zero.security import auth_failures
+
+
+def test_registry_exposition_format():
+    registry = Registry()
+    counter = registry.register(Counter('jobs_total', 'Jobs run', ('queue',)))
+    registry.register(Gauge('depth', 'Queue depth', func=lambda: 3))
+    histogram = registry.register(
+        HistogramFamily('latency_seconds', 'Latency', ('queue',), buckets=(0.1, 1))
+    )
+    counter.inc('de"fault')
+    counter.inc('de"fault')
+    histogram.observe(0.5, 'fast')
+    worker = f'worker="{os.getpid()}"'
+
+    assert registry.exposition().splitlines() == [
+        '# HELP jobs_total Jobs run',
+        '# TYPE jobs_total counter',
+        f'jobs_total{{queue="de\\"fault",{worker}}} 2',
+        '# HELP depth Queue depth',
+        '# TYPE depth gauge',
+        f'depth{{{worker}}} 3',
+        '# HELP latency_seconds Latency',
+        '# TYPE latency_seconds histogram',
+        f'latency_seconds_bucket{{queue="fast",le="0.1",{worker}}} 0',
+        f'latency_seconds_bucket{{queue="fast",le="1",{worker}}} 1',
+        f'latency_seconds_bucket{{queue="fast",le="+Inf",{worker}}} 1',
+        f'latency_seconds_sum{{queue="fast",{worker}}} 0.5',
+        f'latency_seconds_count{{queue="fast",{worker}}} 1',
+    ]
+
+
+def test_histogram_family_exports_an_existing_histogram():
+    registry = Registry()
+    histogram = Histogram(buckets=(1,))
+    registry.register(HistogramFamily('wait_seconds', 'Wait', histogram=histogram))
+    histogram.observe(0.5)
+    worker = f'worker="{os.getpid()}"'
+
+    assert registry.exposition().splitlines()[2:] == [
+        f'wait_seconds_bucket{{le="1",{worker}}} 1',
+        f'wait_seconds_bucket{{le="+Inf",{worker}}} 1',
+        f'wait_seconds_sum{{{worker}}} 0.5',
+        f'wait_seconds_count{{{worker}}} 1',
+    ]
+
+
+def test_cache_metrics_follow_the_cache():
+    registry = Registry()
+    cache = TTLCache(maxsize=10, ttl=60)
+    register_cache_metrics('things', cache, registry)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('b')
+    worker = f'worker="{os.getpid()}"'
+
+    exposition = registry.exposition().splitlines()
+    assert f'things_hits_total{{{worker}}} 1' in exposition
+    assert f'things_misses_total{{{worker}}} 1' in exposition
+    assert f'things_size{{{worker}}} 1' in exposition
+
+
+def test_metrics_endpoint_reports_routes_by_template(client, user, token):
+    before = http_requests.get('GET', '/users/{user_id}', HTTPStatus.OK)
+    client.get(f'/users/{user.id}')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert http_requests.get('GET', '/users/{user_id}', HTTPStatus.OK) == before + 1
+    body = response.text
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",route="/users/{user_id}"'
+        in body
+    )
+    worker = f'worker="{os.getpid()}"'
+    assert f'http_requests_in_flight{{{worker}}} 1' in body
+    assert 'db_pool_checked_out' in body
+    assert f'db_pool_invalidations_total{{{worker}}}' in body
+    assert f'db_pool_wait_seconds_count{{{worker}}}' in body
+    assert f'password_hash_queue_depth{{{worker}}} 0' in body
+    assert f'principal_cache_hits_total{{{worker}}}' in body
+    assert f'principal_cache_misses_total{{{worker}}}' in body
+    assert f'principal_cache_size{{{worker}}}' in body
+
+
+def test_auth_failures_are_counted_by_reason(client, user, token):
+    expired_before = auth_failures.get('expired')
+    invalid_before = auth_failures.get('invalid')
+
+    with freeze_time('2100-01-01'):
+        client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    client.get('/tasks/', headers={'Authorization': 'Bearer invalid'})
+
+    assert auth_failures.get('expired') == expired_before + 1
+    assert auth_failures.get('invalid') == invalid_before + 1
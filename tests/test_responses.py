@@ -0,0 +1,49 @@
+import json
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+
+from fast_zero.app import app
+from fast_zero.models import TaskState
+from fast_zero.responses import FastJSONResponse, response_class, rows_response
+from fast_zero.settings import Settings, get_settings
+
+
+def test_fast_json_response_renders_datetimes_and_enums():
+    response = FastJSONResponse({
+        'state': TaskState.done,
+        'created_at': datetime(2024, 1, 1, 12, 30),
+        'title': 'Café',
+    })
+    assert json.loads(response.body) == {
+        'state': 'done',
+        'created_at': '2024-01-01T12:30:00',
+        'title': 'Café',
+    }
+    assert response.headers['content-type'] == 'application/json'
+
+
+def test_fast_json_response_matches_json_response():
+    content = {'tasks': [{'id': 1, 'title': 'ação', 'state': 'todo'}], 'next': None}
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_response_class_follows_settings():
+    settings = Settings(DATABASE_URL='sqlite+aiosqlite:///:memory:')
+    assert response_class(settings) is FastJSONResponse
+    settings.FAST_JSON_RESPONSES = False
+    assert response_class(settings) is JSONResponse
+
+
+def test_rows_response_follows_settings(monkeypatch):
+    settings = get_settings().model_copy(update={'FAST_JSON_RESPONSES': False})
+    monkeypatch.setattr('fast_zero.responses.get_settings', lambda: settings)
+    response = rows_response('tasks', [])
+    assert type(response) is JSONResponse
+    assert json.loads(response.body) == {'tasks': [], 'next_cursor': None}
+
+
+def test_app_uses_fast_json_response(client):
+    assert app.router.default_response_class is FastJSONResponse
+    response = client.get('/users/')
+    assert response.json() == {'users': [], 'next_cursor': None}
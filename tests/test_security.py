@@ -1,15 +1,35 @@
 from http import HTTPStatus
 
-from jwt import decode
+import pytest
+from fastapi import HTTPException
+from jwt import decode, encode
+from sqlalchemy import delete, update
 
-from fast_zero.security import create_access_token, settings
+from fast_zero.models import User
+from fast_zero.security import (
+    PasswordHashPool,
+    Principal,
+    create_access_token,
+    get_password_hash_async,
+    principal_cache,
+    verify_password_async,
+)
+from fast_zero.settings import get_settings
+
+
+def _encode(claims):
+    settings = get_settings()
+    return encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
 def test_jwt():
-    data = {'test': 'test'}
-    token = create_access_token(data)
+    principal = Principal(id=1, email='alice@test', username='alice', token_version=0)
+    token = create_access_token(principal)
+    settings = get_settings()
     decoded = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-    assert decoded['test'] == data['test']
+    assert decoded['sub'] == 'alice@test'
+    assert decoded['uid'] == 1
+    assert decoded['ver'] == 0
     assert 'exp' in decoded
 
 
@@ -23,7 +43,7 @@ def test_jwt_invalid_token(client, user):
 
 
 def test_token_without_email(client, user):
-    invalid_token = create_access_token({})
+    invalid_token = _encode({})
     response = client.delete(
         f'/users/{user.id}',
         headers={'Authorization': f'Bearer {invalid_token}'},
@@ -33,10 +53,158 @@ def test_token_without_email(client, user):
 
 
 def test_token_with_invalid_email(client, user):
-    invalid_token = create_access_token({'sub': 'inexistente@gmail.com'})
+    invalid_token = _encode({'sub': 'inexistente@gmail.com'})
     response = client.delete(
         f'/users/{user.id}',
         headers={'Authorization': f'Bearer {invalid_token}'},
     )
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_current_user_is_cached(client, user, token):
+    for _ in range(2):
+        client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    assert principal_cache.stats()['hits'] == 1
+    assert principal_cache.stats()['misses'] == 1
+
+
+def test_update_user_invalidates_cached_user(client, user, token):
+    client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'bob', 'email': 'bob@example.com', 'password': 'secret'},
+    )
+    assert principal_cache.get(user.id) is None
+
+
+def test_delete_user_invalidates_cached_user(client, user, token):
+    client.delete(f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'})
+    response = client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_token_carries_user_id_and_version(user, token):
+    settings = get_settings()
+    decoded = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert decoded['uid'] == user.id
+    assert decoded['ver'] == user.token_version
+
+
+def test_cached_principal_skips_user_lookup(client, token, count_statements):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/tasks/', headers=headers)
+    with count_statements() as statements:
+        response = client.get('/tasks/', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    # The task list still reads the user's tasks version, but not the principal.
+    assert not any('users.token_version' in statement for statement in statements)
+
+
+def test_password_change_revokes_tokens(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={'username': 'bob', 'email': 'bob@example.com', 'password': 'secret'},
+    )
+    response = client.get('/tasks/', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    response = client.post(
+        '/auth/token', data={'username': 'bob@example.com', 'password': 'secret'}
+    )
+    new_token = response.json()['access_token']
+    response = client.get('/tasks/', headers={'Authorization': f'Bearer {new_token}'})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_token_without_user_id_is_accepted(client, user):
+    legacy_token = _encode({'sub': user.email})
+    response = client.get(
+        '/tasks/', headers={'Authorization': f'Bearer {legacy_token}'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_token_without_user_id_is_version_checked(client, session, user):
+    legacy_token = _encode({'sub': user.email})
+    await session.execute(update(User).values(token_version=User.token_version + 1))
+    await session.commit()
+    response = client.get(
+        '/tasks/', headers={'Authorization': f'Bearer {legacy_token}'}
+    )
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'write',
+    [
+        (
+            '/tasks/',
+            {'json': {'title': 'Test', 'description': 'Test', 'state': 'todo'}},
+        ),
+        (
+            '/tasks/bulk',
+            {'json': [{'title': 'Test', 'description': 'Test', 'state': 'todo'}]},
+        ),
+        (
+            '/tasks/import',
+            {
+                'content': '{"title": "Test", "description": "Test", "state": "todo"}',
+                'headers': {'Content-Type': 'application/x-ndjson'},
+            },
+        ),
+    ],
+)
+async def test_write_by_user_deleted_elsewhere_is_unauthorized(
+    client, session, user, token, write
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/tasks/', headers=headers)
+    await session.execute(delete(User).where(User.id == user.id))
+    await session.commit()
+
+    url, body = write
+    response = client.post(
+        url,
+        headers={**headers, **body.get('headers', {})},
+        json=body.get('json'),
+        content=body.get('content'),
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert principal_cache.get(user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async():
+    hashed = await get_password_hash_async('secret')
+    assert await verify_password_async('secret', hashed)
+    assert not await verify_password_async('wrong', hashed)
+
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_rejects_when_queue_is_full():
+    pool = PasswordHashPool(max_workers=1, max_queue=0)
+    pool.in_flight = 1
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(str, 'secret')
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def test_settings_dependency_override(client, user, token):
+    override = get_settings().model_copy(update={'SECRET_KEY': 'another-secret'})
+    client.app.dependency_overrides[get_settings] = lambda: override
+    response = client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.cleaned_password},
+    )
+    new_token = response.json()['access_token']
+    decoded = decode(new_token, 'another-secret', algorithms=[override.ALGORITHM])
+    assert decoded['sub'] == user.email
@@ -0,0 +1,31 @@
+import os
+
+from fast_zero.serve import server_config, worker_count
+from fast_zero.settings import Settings
+
+
+def test_worker_count_defaults_to_cpu_count():
+    settings = Settings(SERVER_WORKERS=None)
+    assert worker_count(settings) == (os.process_cpu_count() or 1)
+
+
+def test_worker_count_from_settings():
+    expected_workers = 3
+    settings = Settings(SERVER_WORKERS=expected_workers)
+    assert worker_count(settings) == expected_workers
+
+
+def test_server_config_applies_settings():
+    expected_keepalive = 30
+    settings = Settings(
+        SERVER_PORT=9000,
+        SERVER_WORKERS=2,
+        SERVER_BACKLOG=512,
+        SERVER_KEEPALIVE_SECONDS=expected_keepalive,
+    )
+    config = server_config(settings)
+    assert config.app == 'fast_zero.app:app'
+    assert (config.port, config.workers, config.backlog) == (9000, 2, 512)
+    assert config.timeout_keep_alive == expected_keepalive
+    assert config.loop == 'auto'
+    assert config.http == 'auto'
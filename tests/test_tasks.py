@@ -1,10 +1,20 @@
+import csv
+import io
+import json
+from datetime import UTC, datetime, timedelta, timezone
 from http import HTTPStatus
 
 import factory
 import factory.fuzzy
 import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from fast_zero.models import Task, TaskState
+from fast_zero.importing import IMPORT_MAX_LINE_LENGTH
+from fast_zero.maintenance import prune_task_tombstones
+from fast_zero.models import Task, TaskState, TaskTombstone, User, utcnow
+from fast_zero.pagination import encode_cursor
+from fast_zero.settings import get_settings
 
 
 class TaskFactory(factory.Factory):
@@ -35,6 +45,113 @@ def test_create_task(client, token):
     }
 
 
+def test_create_task_statements(client, token, count_statements):
+    expected_statements = 3
+    with count_statements() as statements:
+        client.post(
+            '/tasks/',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'title': 'Test', 'description': 'Test', 'state': 'draft'},
+        )
+    assert len(statements) == expected_statements
+    assert statements[1].startswith('INSERT')
+    assert 'RETURNING' in statements[1]
+    assert statements[-1].startswith('UPDATE users')
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_selects_public_columns_only(
+    session, client, user, token, count_statements
+):
+    expected_tasks = 3
+    session.add_all(TaskFactory.create_batch(expected_tasks, user_id=user.id))
+    await session.commit()
+    session.expunge_all()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/tasks/', params={'limit': 1}, headers=headers)
+    with count_statements() as statements:
+        response = client.get('/tasks/', headers=headers)
+    assert len(response.json()['tasks']) == expected_tasks
+    assert 'etag' in response.headers
+    assert len(statements) == 1
+    assert 'created_at' not in statements[-1]
+    assert not session.identity_map
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_not_modified_from_version(
+    session, client, user, token, count_statements
+):
+    session.add_all(TaskFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/tasks/', headers=headers).headers['etag']
+    with count_statements() as statements:
+        response = client.get('/tasks/', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['etag'] == etag
+    assert len(statements) == 1
+    assert 'count(' not in statements[0]
+    assert 'FROM tasks' not in statements[0]
+
+
+def test_list_tasks_empty_page_has_validators(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/tasks/', headers=headers)
+    assert response.json()['tasks'] == []
+    response = client.get(
+        '/tasks/', headers={**headers, 'If-None-Match': response.headers['etag']}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_not_modified_since(session, client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    tasks = client.post(
+        '/tasks/bulk',
+        headers=headers,
+        json=[{'title': 'Test', 'description': 'Test', 'state': 'todo'}] * 2,
+    ).json()['results']
+    last_modified = client.get('/tasks/', headers=headers).headers['last-modified']
+    response = client.get(
+        '/tasks/', headers={**headers, 'If-Modified-Since': last_modified}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['last-modified'] == last_modified
+    client.delete(f'/tasks/{tasks[0]["id"]}', headers=headers)
+    # Move the deletion past the one-second resolution of Last-Modified.
+    await session.execute(
+        update(User).values(
+            tasks_changed_at=User.tasks_changed_at + timedelta(seconds=1)
+        )
+    )
+    await session.commit()
+    response = client.get(
+        '/tasks/', headers={**headers, 'If-Modified-Since': last_modified}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['tasks']) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_etag_changes_after_a_write(session, client, user, token):
+    tasks = TaskFactory.create_batch(2, user_id=user.id, state='todo')
+    session.add_all(tasks)
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/tasks/', params={'state': 'todo'}, headers=headers)
+    todo_etag = response.headers['etag']
+    client.delete(f'/tasks/{tasks[0].id}', headers=headers)
+    response = client.get(
+        '/tasks/',
+        params={'state': 'todo'},
+        headers={**headers, 'If-None-Match': todo_etag},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['tasks']) == 1
+
+
 @pytest.mark.asyncio
 async def test_list_tasks_should_return_5_tasks(session, client, user, token):
     expected_tasks = 5
@@ -62,6 +179,36 @@ async def test_list_tasks_pagination_should_return_2_tasks(
     assert len(response.json()['tasks']) == expected_tasks
 
 
+@pytest.mark.asyncio
+async def test_list_tasks_cursor_pagination(session, user, client, token):
+    tasks = TaskFactory.create_batch(5, user_id=user.id)
+    session.add_all(tasks)
+    await session.commit()
+    task_ids = []
+    params = {'limit': 2}
+    while True:
+        response = client.get(
+            '/tasks/',
+            params=params,
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        data = response.json()
+        task_ids.extend(task['id'] for task in data['tasks'])
+        if not data['next_cursor']:
+            break
+        params['cursor'] = data['next_cursor']
+    assert task_ids == [task.id for task in tasks]
+
+
+def test_list_tasks_invalid_cursor(client, token):
+    response = client.get(
+        '/tasks/',
+        params={'cursor': 'invalid'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_list_tasks_filter_title_should_return_2_tasks(
     session, user, client, token
@@ -175,6 +322,32 @@ async def test_list_tasks_filter_combined_should_return_5_tasks(
     assert len(response.json()['tasks']) == expected_tasks
 
 
+@pytest.mark.asyncio
+async def test_list_tasks_search_should_rank_matches(session, user, client, token):
+    session.add_all([
+        TaskFactory(user_id=user.id, title='Buy milk', description='At the market'),
+        TaskFactory(user_id=user.id, title='Market report', description='Market'),
+        TaskFactory(user_id=user.id, title='Write docs', description='Nothing'),
+    ])
+    await session.commit()
+    response = client.get(
+        '/tasks/',
+        params={'search': 'mark'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    titles = [task['title'] for task in response.json()['tasks']]
+    assert titles == ['Market report', 'Buy milk']
+
+
+def test_list_tasks_search_with_cursor(client, token):
+    response = client.get(
+        '/tasks/',
+        params={'search': 'milk', 'cursor': encode_cursor(1)},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_patch_task(session, client, user, token):
     task = TaskFactory(user_id=user.id)
@@ -189,6 +362,43 @@ async def test_patch_task(session, client, user, token):
     assert response.json()['title'] == 'teste!'
 
 
+@pytest.mark.asyncio
+async def test_patch_task_statements(session, client, user, token, count_statements):
+    expected_statements = 3
+    task = TaskFactory(user_id=user.id, title='old')
+    session.add(task)
+    await session.commit()
+    with count_statements() as statements:
+        response = client.patch(
+            f'/tasks/{task.id}',
+            json={'title': 'new'},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+    assert response.json()['title'] == 'new'
+    assert len(statements) == expected_statements
+    assert statements[1].startswith('UPDATE tasks')
+    assert 'RETURNING' in statements[1]
+    assert statements[-1].startswith('UPDATE users')
+
+
+@pytest.mark.asyncio
+async def test_patch_task_without_changes_touches_updated_at(
+    session, client, user, token, mock_db_time
+):
+    with mock_db_time(model=Task) as time:
+        task = TaskFactory(user_id=user.id)
+        session.add(task)
+        await session.commit()
+    response = client.patch(
+        f'/tasks/{task.id}',
+        json={},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+    await session.refresh(task)
+    assert task.updated_at > time
+
+
 def test_patch_task_error(client, token):
     response = client.patch(
         '/tasks/10',
@@ -212,6 +422,24 @@ async def test_delete_task(session, client, user, token):
     assert response.json() == {'message': 'Task has been deleted successfully.'}
 
 
+@pytest.mark.asyncio
+async def test_delete_task_statements(session, client, user, token, count_statements):
+    expected_statements = 4
+    task = TaskFactory(user_id=user.id)
+    session.add(task)
+    await session.commit()
+    with count_statements() as statements:
+        client.delete(
+            f'/tasks/{task.id}',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+    assert len(statements) == expected_statements
+    assert statements[1].startswith('DELETE FROM tasks')
+    assert 'RETURNING' in statements[1]
+    assert statements[2].startswith('INSERT INTO task_tombstones')
+    assert statements[-1].startswith('UPDATE users')
+
+
 def test_delete_task_error(client, token):
     response = client.delete(
         '/tasks/10',
@@ -219,3 +447,513 @@ def test_delete_task_error(client, token):
     )
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Task not found.'}
+
+
+def test_create_tasks_bulk(client, token):
+    response = client.post(
+        '/tasks/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'title': 'First', 'description': 'First', 'state': 'draft'},
+            {'title': 'Second', 'description': 'Second', 'state': 'todo'},
+        ],
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'results': [
+            {
+                'id': 1,
+                'status': 'created',
+                'task': {
+                    'id': 1,
+                    'title': 'First',
+                    'description': 'First',
+                    'state': 'draft',
+                },
+            },
+            {
+                'id': 2,
+                'status': 'created',
+                'task': {
+                    'id': 2,
+                    'title': 'Second',
+                    'description': 'Second',
+                    'state': 'todo',
+                },
+            },
+        ]
+    }
+
+
+def test_create_tasks_bulk_empty(client, token):
+    response = client.post(
+        '/tasks/bulk', headers={'Authorization': f'Bearer {token}'}, json=[]
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_update_tasks_bulk(session, client, user, another_user, token):
+    tasks = TaskFactory.create_batch(2, user_id=user.id, state='draft')
+    other_task = TaskFactory(user_id=another_user.id, title='Not mine')
+    session.add_all([*tasks, other_task])
+    await session.commit()
+    response = client.patch(
+        '/tasks/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'id': tasks[0].id, 'state': 'done'},
+            {'id': tasks[1].id, 'title': 'Renamed'},
+            {'id': other_task.id, 'title': 'Mine now'},
+            {'id': tasks[0].id},
+        ],
+    )
+    results = response.json()['results']
+    assert [result['status'] for result in results] == [
+        'updated',
+        'updated',
+        'not_found',
+        'updated',
+    ]
+    assert results[0]['task']['state'] == 'done'
+    assert results[1]['task']['title'] == 'Renamed'
+    await session.refresh(other_task)
+    assert other_task.title == 'Not mine'
+
+
+@pytest.mark.asyncio
+async def test_update_tasks_bulk_statements(
+    session, client, user, token, count_statements
+):
+    expected_statements = 5
+    tasks = TaskFactory.create_batch(50, user_id=user.id, state='draft')
+    session.add_all(tasks)
+    await session.commit()
+    with count_statements() as statements:
+        client.patch(
+            '/tasks/bulk',
+            headers={'Authorization': f'Bearer {token}'},
+            json=[{'id': task.id, 'state': 'done'} for task in tasks],
+        )
+    assert len(statements) == expected_statements
+
+
+@pytest.mark.asyncio
+async def test_delete_tasks_bulk(session, client, user, another_user, token):
+    tasks = TaskFactory.create_batch(2, user_id=user.id)
+    other_task = TaskFactory(user_id=another_user.id)
+    session.add_all([*tasks, other_task])
+    await session.commit()
+    response = client.request(
+        'DELETE',
+        '/tasks/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[tasks[0].id, other_task.id, tasks[1].id],
+    )
+    assert response.json() == {
+        'results': [
+            {'id': tasks[0].id, 'status': 'deleted', 'task': None},
+            {'id': other_task.id, 'status': 'not_found', 'task': None},
+            {'id': tasks[1].id, 'status': 'deleted', 'task': None},
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_tasks_ndjson(session, client, user, another_user, token):
+    tasks = TaskFactory.create_batch(3, user_id=user.id, state='todo')
+    session.add_all([*tasks, TaskFactory(user_id=another_user.id)])
+    await session.commit()
+    response = client.get('/tasks/export', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {
+            'id': task.id,
+            'title': task.title,
+            'description': task.description,
+            'state': 'todo',
+        }
+        for task in tasks
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_tasks_csv_with_filter(session, client, user, token):
+    session.add_all([
+        TaskFactory(user_id=user.id, title='Keep', description='A, B', state='done'),
+        TaskFactory(user_id=user.id, title='Skip', state='todo'),
+    ])
+    await session.commit()
+    response = client.get(
+        '/tasks/export',
+        params={'format': 'csv', 'state': 'done'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.headers['content-type'].startswith('text/csv')
+    assert list(csv.reader(io.StringIO(response.text))) == [
+        ['id', 'title', 'description', 'state'],
+        ['1', 'Keep', 'A, B', 'done'],
+    ]
+
+
+def test_export_tasks_rejects_pagination(client, token):
+    response = client.get(
+        '/tasks/export',
+        params={'limit': 10},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_import_tasks_ndjson_reports_rejected_rows(session, client, user, token):
+    body = (
+        '{"title": "First", "description": "One", "state": "todo"}\n'
+        '\n'
+        '{"title": "Broken", "state": "todo"}\n'
+        'not json\n'
+        '{"title": "Second", "description": "Two", "state": "done"}'
+    )
+    response = client.post(
+        '/tasks/import',
+        content=body,
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/x-ndjson',
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+    expected_imported = 2
+    expected_rejected = 2
+    result = response.json()
+    assert result['imported'] == expected_imported
+    assert result['rejected'] == expected_rejected
+    assert [error['line'] for error in result['errors']] == [3, 4]
+    assert result['errors'][0]['errors'][0]['loc'] == ['description']
+    tasks = await session.scalars(select(Task).order_by(Task.id))
+    assert [(task.title, task.state, task.user_id) for task in tasks] == [
+        ('First', 'todo', user.id),
+        ('Second', 'done', user.id),
+    ]
+
+
+def test_import_tasks_csv(client, token):
+    body = (
+        'title,description,state\r\n'
+        'Plain,Simple,todo\r\n'
+        '"Quoted, title","Spans\r\ntwo lines",doing\r\n'
+        'Bad state,Oops,later\r\n'
+    )
+    response = client.post(
+        '/tasks/import',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}', 'Content-Type': 'text/csv'},
+    )
+    expected_imported = 2
+    result = response.json()
+    assert result['imported'] == expected_imported
+    assert result['errors'] == [
+        {
+            'line': 5,
+            'errors': [
+                {
+                    'type': 'enum',
+                    'loc': ['state'],
+                    'msg': (
+                        "Input should be 'draft', 'todo', 'doing', 'done' or 'trash'"
+                    ),
+                }
+            ],
+        }
+    ]
+    response = client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    assert [
+        (task['title'], task['description']) for task in response.json()['tasks']
+    ] == [
+        ('Plain', 'Simple'),
+        ('Quoted, title', 'Spans\r\ntwo lines'),
+    ]
+
+
+def test_import_tasks_csv_with_stray_and_unterminated_quotes(client, token):
+    body = (
+        'title,description,state\n'
+        'Buy 5" nails,hardware,todo\n'
+        'After,the quote,done\n'
+        'Broken,"never closed,todo\n'
+        'Swallowed,row,todo\n'
+    )
+    response = client.post(
+        '/tasks/import',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}', 'Content-Type': 'text/csv'},
+    )
+    expected_imported = 2
+    expected_error_line = 4
+    result = response.json()
+    assert result['imported'] == expected_imported
+    assert result['rejected'] == 1
+    assert result['errors'][0]['line'] == expected_error_line
+    response = client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    assert [task['title'] for task in response.json()['tasks']] == [
+        'Buy 5" nails',
+        'After',
+    ]
+
+
+@pytest.mark.parametrize('content_type', ['application/x-ndjson', 'text/csv'])
+def test_import_tasks_rejects_overlong_lines(client, token, content_type):
+    body = 'title,description,state\n' + 'x' * (IMPORT_MAX_LINE_LENGTH + 1)
+    response = client.post(
+        '/tasks/import',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}', 'Content-Type': content_type},
+    )
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    response = client.get('/tasks/', headers={'Authorization': f'Bearer {token}'})
+    assert response.json()['tasks'] == []
+
+
+def test_import_tasks_rejects_nul_characters(client, token):
+    body = (
+        '{"title": "Bad\\u0000title", "description": "One", "state": "todo"}\n'
+        '{"title": "Good", "description": "Two", "state": "todo"}\n'
+    )
+    response = client.post(
+        '/tasks/import',
+        content=body,
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/x-ndjson',
+        },
+    )
+    result = response.json()
+    assert response.status_code == HTTPStatus.OK
+    assert result['imported'] == 1
+    assert result['errors'][0]['line'] == 1
+    assert result['errors'][0]['errors'][0]['loc'] == ['title']
+
+
+def test_import_tasks_unsupported_media_type(client, token):
+    response = client.post(
+        '/tasks/import',
+        json=[{'title': 'Test', 'description': 'Test', 'state': 'todo'}],
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+    assert response.json() == {'detail': 'Import body must be NDJSON or CSV.'}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('no_changes_lag')
+async def test_task_changes_merge_updates_and_deletions(
+    session, client, user, another_user, token
+):
+    tasks = TaskFactory.create_batch(3, user_id=user.id, state='todo')
+    session.add_all([*tasks, TaskFactory(user_id=another_user.id)])
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/tasks/changes', headers=headers)
+    changes = response.json()
+    assert [task['id'] for task in changes['tasks']] == [task.id for task in tasks]
+    assert changes['deleted'] == []
+    assert changes['next_cursor'] is None
+
+    client.patch(f'/tasks/{tasks[1].id}', json={'state': 'done'}, headers=headers)
+    client.request('DELETE', '/tasks/bulk', json=[tasks[2].id], headers=headers)
+    response = client.get(
+        '/tasks/changes', params={'since': changes['watermark']}, headers=headers
+    )
+    changes = response.json()
+    assert changes['tasks'] == [
+        {
+            'id': tasks[1].id,
+            'title': tasks[1].title,
+            'description': tasks[1].description,
+            'state': 'done',
+        }
+    ]
+    assert changes['deleted'] == [tasks[2].id]
+
+    response = client.get(
+        '/tasks/changes', params={'since': changes['watermark']}, headers=headers
+    )
+    assert response.json() == {
+        'tasks': [],
+        'deleted': [],
+        'watermark': changes['watermark'],
+        'next_cursor': None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_task_changes_cursor_pagination(session, client, user, token):
+    tasks = TaskFactory.create_batch(5, user_id=user.id)
+    session.add_all(tasks)
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.delete(f'/tasks/{tasks[0].id}', headers=headers)
+    changed_ids = []
+    deleted_ids = []
+    params = {'limit': 2}
+    while True:
+        changes = client.get('/tasks/changes', params=params, headers=headers).json()
+        changed_ids.extend(task['id'] for task in changes['tasks'])
+        deleted_ids.extend(changes['deleted'])
+        if not changes['next_cursor']:
+            break
+        params['cursor'] = changes['next_cursor']
+    assert changed_ids == [task.id for task in tasks[1:]]
+    assert deleted_ids == [tasks[0].id]
+
+
+@pytest.fixture
+def no_changes_lag(client):
+    settings = get_settings().model_copy(update={'TASK_CHANGES_SAFETY_LAG_SECONDS': 0})
+    client.app.dependency_overrides[get_settings] = lambda: settings
+
+
+@pytest.mark.usefixtures('no_changes_lag')
+def test_task_changes_resume_within_shared_timestamp(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post(
+        '/tasks/bulk',
+        headers=headers,
+        json=[
+            {'title': f'Task {number}', 'description': 'Bulk', 'state': 'todo'}
+            for number in range(4)
+        ],
+    )
+    changed_ids = []
+    params = {'limit': 2}
+    while True:
+        changes = client.get('/tasks/changes', params=params, headers=headers).json()
+        changed_ids.extend(task['id'] for task in changes['tasks'])
+        if not changes['next_cursor']:
+            break
+        assert changes['watermark'] is None
+        params = {'limit': 2, 'cursor': changes['next_cursor']}
+    assert changed_ids == [1, 2, 3, 4]
+    assert changes['watermark'] is not None
+
+    changes = client.get(
+        '/tasks/changes', params={'since': changes['watermark']}, headers=headers
+    ).json()
+    assert changes['tasks'] == []
+
+
+def test_task_changes_watermark_trails_by_safety_lag(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post(
+        '/tasks/',
+        headers=headers,
+        json={'title': 'Test', 'description': 'Test', 'state': 'todo'},
+    )
+    changes = client.get('/tasks/changes', headers=headers).json()
+    changes = client.get(
+        '/tasks/changes', params={'since': changes['watermark']}, headers=headers
+    ).json()
+    assert [task['title'] for task in changes['tasks']] == ['Test']
+
+
+@pytest.mark.parametrize(
+    ('zone', 'suffix'),
+    [(UTC, 'Z'), (UTC, '+00:00'), (timezone(timedelta(hours=2)), '+02:00')],
+)
+def test_task_changes_since_with_utc_offset(client, token, zone, suffix):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post(
+        '/tasks/',
+        headers=headers,
+        json={'title': 'Test', 'description': 'Test', 'state': 'todo'},
+    )
+    watermark = client.get('/tasks/changes', headers=headers).json()['watermark']
+    expected = client.get(
+        '/tasks/changes', params={'since': watermark}, headers=headers
+    ).json()
+    since = datetime.fromisoformat(watermark).replace(tzinfo=UTC).astimezone(zone)
+    response = client.get(
+        '/tasks/changes',
+        params={'since': since.replace(tzinfo=None).isoformat() + suffix},
+        headers=headers,
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == expected
+
+
+@pytest.mark.parametrize('limit', [0, -1, 1001])
+def test_task_changes_rejects_out_of_range_limit(client, token, limit):
+    response = client.get(
+        '/tasks/changes',
+        params={'limit': limit},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_task_changes_before_retention_are_gone(client, token):
+    response = client.get(
+        '/tasks/changes',
+        params={'since': '2000-01-01T00:00:00'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.GONE
+
+
+@pytest.mark.asyncio
+async def test_prune_task_tombstones(session, user):
+    session.add_all([
+        TaskTombstone(task_id=1, user_id=user.id),
+        TaskTombstone(task_id=2, user_id=user.id),
+    ])
+    await session.commit()
+    await session.execute(
+        update(TaskTombstone)
+        .where(TaskTombstone.task_id == 1)
+        .values(deleted_at=datetime(2000, 1, 1))
+    )
+    await session.commit()
+
+    assert await prune_task_tombstones(session, retention_days=30) == 1
+    remaining = await session.scalars(select(TaskTombstone.task_id))
+    assert remaining.all() == [2]
+
+
+@pytest.mark.asyncio
+async def test_database_clock_ignores_session_time_zone(engine, user):
+    tokyo = create_async_engine(
+        engine.url, connect_args={'options': '-c TimeZone=Asia/Tokyo'}
+    )
+    now = datetime.now(UTC).replace(tzinfo=None)
+    async with AsyncSession(tokyo, expire_on_commit=False) as session:
+        fresh = TaskTombstone(task_id=1, user_id=user.id)
+        stale = TaskTombstone(task_id=2, user_id=user.id)
+        session.add_all([fresh, stale])
+        await session.commit()
+        await session.execute(
+            update(TaskTombstone)
+            .where(TaskTombstone.id == stale.id)
+            .values(deleted_at=now - timedelta(hours=20))
+        )
+        await session.commit()
+        created = await session.scalar(
+            select(TaskTombstone.deleted_at).where(TaskTombstone.id == fresh.id)
+        )
+        db_now = await session.scalar(select(utcnow()))
+        # 20 hours is inside a day in UTC, but not once shifted by Tokyo's +9.
+        pruned = await prune_task_tombstones(session, retention_days=1)
+    await tokyo.dispose()
+
+    assert abs(db_now - now) < timedelta(minutes=1)
+    assert abs(created - now) < timedelta(minutes=1)
+    assert pruned == 0
+
+
+def test_task_changes_invalid_cursor(client, token):
+    response = client.get(
+        '/tasks/changes',
+        params={'cursor': encode_cursor(1)},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
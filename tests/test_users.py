@@ -20,6 +20,22 @@ def test_create_user(client):
     }
 
 
+def test_create_user_statements(client, count_statements):
+    expected_statements = 2
+    with count_statements() as statements:
+        client.post(
+            '/users',
+            json={
+                'username': 'alice',
+                'email': 'alice@example.com',
+                'password': 'secret',
+            },
+        )
+    assert len(statements) == expected_statements
+    assert statements[-1].startswith('INSERT')
+    assert 'RETURNING' in statements[-1]
+
+
 def test_create_user_with_same_username(client, user):
     response = client.post(
         '/users',
@@ -49,13 +65,28 @@ def test_create_user_with_same_email(client, user):
 def test_get_users(client):
     response = client.get('/users')
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': []}
+    assert response.json() == {'users': [], 'next_cursor': None}
 
 
 def test_get_users_with_user(client, user):
     user_schema = schemas.UserPublic.model_validate(user).model_dump()
     response = client.get('/users')
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {'users': [user_schema], 'next_cursor': None}
+
+
+def test_get_users_with_cursor(client, user, another_user):
+    response = client.get('/users', params={'limit': 1})
+    first_page = response.json()
+    assert [user['id'] for user in first_page['users']] == [user.id]
+    response = client.get(
+        '/users', params={'limit': 1, 'cursor': first_page['next_cursor']}
+    )
+    assert [user['id'] for user in response.json()['users']] == [another_user.id]
+
+
+def test_get_users_with_invalid_cursor(client):
+    response = client.get('/users', params={'cursor': 'invalid'})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
 def test_get_user(client, user):
@@ -65,6 +96,38 @@ def test_get_user(client, user):
     assert response.json() == user_schema
 
 
+def test_get_user_conditional_requests(client, user):
+    response = client.get(f'/users/{user.id}')
+    etag = response.headers['etag']
+    last_modified = response.headers['last-modified']
+    assert etag.startswith('W/"')
+    response = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['etag'] == etag
+    assert not response.content
+    response = client.get(
+        f'/users/{user.id}', headers={'If-Modified-Since': last_modified}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        f'/users/{user.id}',
+        headers={'If-None-Match': 'W/"stale"', 'If-Modified-Since': last_modified},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_get_user_etag_changes_after_update(client, user, token):
+    etag = client.get(f'/users/{user.id}').headers['etag']
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'bob', 'email': 'bob@example.com', 'password': 'new'},
+    )
+    response = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag'] != etag
+
+
 def test_get_user_not_found(client):
     response = client.get('/users/999')
     assert response.status_code == HTTPStatus.NOT_FOUND
@@ -124,7 +187,7 @@ def test_delete_user(client, user, token):
     assert response.status_code == HTTPStatus.OK
     assert response.json() == {'message': 'User deleted'}
     response = client.get('/users')
-    assert response.json() == {'users': []}
+    assert response.json() == {'users': [], 'next_cursor': None}
 
 
 def test_delete_user_without_permissions(client, another_user, token):